@@ -6,13 +6,40 @@ Example: "Anomaly caused by 23% increase in token usage from /stress endpoint"
 """
 
 import os
+import asyncio
+import bisect
+import functools
+import heapq
 import logging
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime, timedelta
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain, repeat
+from typing import Callable, Dict, List, Any, NamedTuple, Optional, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from dataclasses import dataclass, field
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Dimensions an anomaly can be attributed to
+ATTRIBUTION_DIMENSIONS = ("endpoint", "model", "request_type")
+
+# Datadog queries are I/O bound, so every window/dimension query runs concurrently
+MAX_QUERY_WORKERS = 8
+
+# Reduced query results are reused while the UI polls the same windows
+QUERY_CACHE_TTL_SECONDS = 60
+QUERY_CACHE_MAX_ENTRIES = 512
+# Query windows are snapped to this grid so near-simultaneous calls share cache entries
+QUERY_BUCKET_SECONDS = 30
+
+# Severity bands by absolute change %: <=50 low, <=100 medium, <=200 high, >200 critical
+SEVERITY_THRESHOLDS = (50, 100, 200)
+SEVERITY_LEVELS = ("low", "medium", "high", "critical")
+
 try:
     from datadog import api
     DD_API_AVAILABLE = True
@@ -21,9 +48,26 @@ except ImportError:
     logger.warning("Datadog API not available. Install: pip install datadog")
 
 
-@dataclass
+def _pointlist_values(pointlist: List[List[Any]]) -> np.ndarray:
+    """Return the values of a Datadog pointlist as float64, with null points as NaN."""
+    if not pointlist:
+        return np.empty(0, dtype=np.float64)
+    return np.array(pointlist, dtype=np.float64)[:, 1]
+
+
+class Breakdown(NamedTuple):
+    """Change of one dimension value (endpoint, model, ...) between baseline and analysis windows."""
+    name: str
+    baseline_value: float
+    analysis_value: float
+    change_pct: float
+    abs_change_pct: float
+    contribution_pct: float
+
+
+@dataclass(slots=True, frozen=True)
 class AnomalyAttribution:
-    """Represents an anomaly with its attributed causes."""
+    """Represents an anomaly with its attributed causes (immutable once attributed)."""
     anomaly_id: str
     anomaly_type: str  # "cost_spike", "latency_spike", "error_burst", "quality_drop"
     detected_at: str
@@ -43,6 +87,9 @@ class AnomalyAttribution:
     affected_endpoints: List[str]
     affected_models: List[str]
     time_window: str
+    
+    # Report dict built lazily by generate_attribution_report
+    _report_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
 
 class AnomalyAttributionEngine:
@@ -56,7 +103,15 @@ class AnomalyAttributionEngine:
     - Provide causal analysis
     """
     
+    # Query templates, formatted with % so the query string doubles as a stable cache key
+    _METRIC_QUERY_TMPL = "avg:%s{service:llm-reliability-control-plane}"
+    _BREAKDOWN_QUERY_TMPL = _METRIC_QUERY_TMPL + " by {%s}"
+    
     def __init__(self):
+        # (metric_name, query, start, end) -> (expires_at, reduced value), in LRU order
+        self._query_cache: "OrderedDict[Tuple[str, str, int, int], Tuple[float, Any]]" = OrderedDict()
+        self._query_cache_lock = threading.RLock()
+        
         # Initialize Datadog if available
         if DD_API_AVAILABLE:
             self.api_key = os.getenv("DD_API_KEY") or os.getenv("LRCP_DATADOG_API_KEY")
@@ -89,27 +144,20 @@ class AnomalyAttributionEngine:
         Returns:
             AnomalyAttribution with causes and confidence scores
         """
-        # Calculate time windows
-        analysis_start = anomaly_timestamp - timedelta(hours=analysis_window_hours)
-        analysis_end = anomaly_timestamp + timedelta(hours=analysis_window_hours)
-        baseline_start = analysis_start - timedelta(hours=baseline_period_hours)
+        # Calculate time windows (epoch seconds)
+        anomaly_ts = int(anomaly_timestamp.timestamp())
+        analysis_start = anomaly_ts - analysis_window_hours * 3600
+        analysis_end = anomaly_ts + analysis_window_hours * 3600
+        baseline_start = analysis_start - baseline_period_hours * 3600
         
         # Fetch metrics from Datadog
         if self.datadog_enabled:
-            anomaly_value, baseline_value = self._fetch_metric_comparison(
+            (anomaly_value, baseline_value), breakdowns = self._fetch_attribution_data(
                 metric_name, baseline_start, analysis_start, analysis_end
             )
-            
-            # Get breakdown by dimensions
-            endpoint_breakdown = self._fetch_breakdown_by_dimension(
-                metric_name, "endpoint", analysis_start, analysis_end, baseline_start, analysis_start
-            )
-            model_breakdown = self._fetch_breakdown_by_dimension(
-                metric_name, "model", analysis_start, analysis_end, baseline_start, analysis_start
-            )
-            request_type_breakdown = self._fetch_breakdown_by_dimension(
-                metric_name, "request_type", analysis_start, analysis_end, baseline_start, analysis_start
-            )
+            endpoint_breakdown = breakdowns["endpoint"]
+            model_breakdown = breakdowns["model"]
+            request_type_breakdown = breakdowns["request_type"]
         else:
             # Fallback to simulated data
             anomaly_value, baseline_value = self._simulate_metric_comparison(metric_name)
@@ -123,24 +171,19 @@ class AnomalyAttributionEngine:
         # Determine anomaly type
         anomaly_type = self._classify_anomaly_type(metric_name, change_percentage)
         
-        # Find primary cause
-        primary_cause, primary_confidence = self._identify_primary_cause(
+        # Find primary cause and contributing factors
+        primary_cause, primary_confidence, contributing_factors = self._analyze_breakdowns(
             endpoint_breakdown, model_breakdown, request_type_breakdown, change_percentage
         )
         
-        # Find contributing factors
-        contributing_factors = self._identify_contributing_factors(
-            endpoint_breakdown, model_breakdown, request_type_breakdown, primary_cause
-        )
-        
         # Calculate total confidence
         total_confidence = self._calculate_total_confidence(
             primary_confidence, contributing_factors, change_percentage
         )
         
         # Get affected endpoints/models
-        affected_endpoints = [item['name'] for item in endpoint_breakdown if item['change_pct'] > 10]
-        affected_models = [item['name'] for item in model_breakdown if item['change_pct'] > 10]
+        affected_endpoints = [item.name for item in endpoint_breakdown if item.change_pct > 10]
+        affected_models = [item.name for item in model_breakdown if item.change_pct > 10]
         
         # Determine severity
         severity = self._determine_severity(change_percentage, anomaly_type)
@@ -161,130 +204,286 @@ class AnomalyAttributionEngine:
             time_window=f"{analysis_window_hours}h"
         )
         
-        logger.info(f"Attributed anomaly: {anomaly_type} - {primary_cause['description']} (confidence: {total_confidence:.1%})")
+        logger.info(
+            "Attributed anomaly: %s - %s (confidence: %.1f%%)",
+            anomaly_type, primary_cause['description'], total_confidence * 100
+        )
         return attribution
     
-    def _fetch_metric_comparison(
+    async def attribute_anomaly_async(
         self,
         metric_name: str,
-        baseline_start: datetime,
-        baseline_end: datetime,
-        anomaly_end: datetime
-    ) -> Tuple[float, float]:
-        """Fetch metric values for comparison."""
-        try:
-            # Fetch baseline
-            baseline_query = f"avg:{metric_name}{{service:llm-reliability-control-plane}}"
-            baseline_response = api.Metric.query(
-                start=int(baseline_start.timestamp()),
-                end=int(baseline_end.timestamp()),
-                query=baseline_query
-            )
-            
-            baseline_value = 0.0
-            if 'series' in baseline_response:
-                values = []
-                for series in baseline_response['series']:
-                    if 'pointlist' in series:
-                        for point in series['pointlist']:
-                            if point[1] is not None:
-                                values.append(point[1])
-                if values:
-                    baseline_value = sum(values) / len(values)
-            
-            # Fetch anomaly period
-            anomaly_query = f"avg:{metric_name}{{service:llm-reliability-control-plane}}"
-            anomaly_response = api.Metric.query(
-                start=int(baseline_end.timestamp()),
-                end=int(anomaly_end.timestamp()),
-                query=anomaly_query
+        anomaly_timestamp: datetime,
+        baseline_period_hours: int = 24,
+        analysis_window_hours: int = 1
+    ) -> AnomalyAttribution:
+        """
+        Async-friendly attribute_anomaly for request handlers.
+        
+        The Datadog SDK is blocking, so attribution runs in the default executor
+        instead of stalling the event loop for the duration of the queries.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            functools.partial(
+                self.attribute_anomaly,
+                metric_name,
+                anomaly_timestamp,
+                baseline_period_hours=baseline_period_hours,
+                analysis_window_hours=analysis_window_hours
             )
-            
-            anomaly_value = 0.0
-            if 'series' in anomaly_response:
-                values = []
-                for series in anomaly_response['series']:
-                    if 'pointlist' in series:
-                        for point in series['pointlist']:
-                            if point[1] is not None:
-                                values.append(point[1])
-                if values:
-                    anomaly_value = sum(values) / len(values)
-            
-            return anomaly_value, baseline_value
-        except Exception as e:
-            logger.warning(f"Could not fetch metric comparison: {e}")
-            return 0.0, 0.0
+        )
     
-    def _fetch_breakdown_by_dimension(
+    def _fetch_attribution_data(
         self,
         metric_name: str,
-        dimension: str,
-        analysis_start: datetime,
-        analysis_end: datetime,
-        baseline_start: datetime,
-        baseline_end: datetime
-    ) -> List[Dict[str, Any]]:
-        """Fetch metric breakdown by dimension (endpoint, model, etc.)."""
-        try:
-            breakdown = []
-            
-            # Fetch analysis period
-            analysis_query = f"avg:{metric_name}{{service:llm-reliability-control-plane}} by {dimension}"
-            analysis_response = api.Metric.query(
-                start=int(analysis_start.timestamp()),
-                end=int(analysis_end.timestamp()),
-                query=analysis_query
+        baseline_start: int,
+        analysis_start: int,
+        analysis_end: int
+    ) -> Tuple[Tuple[float, float], Dict[str, List[Breakdown]]]:
+        """
+        Fetch the metric comparison and all dimension breakdowns concurrently.
+        
+        Issues the baseline/anomaly queries plus one joint
+        ``by {endpoint,model,request_type}`` query per window in parallel, so
+        latency is bounded by the slowest of four queries. A window whose joint
+        query fails falls back to one query per dimension.
+        
+        Returns:
+            ((anomaly_value, baseline_value), {dimension: breakdown})
+        """
+        with ThreadPoolExecutor(max_workers=MAX_QUERY_WORKERS) as executor:
+            baseline_future = executor.submit(
+                self._query_metric_average, metric_name, baseline_start, analysis_start
             )
-            
-            # Fetch baseline period
-            baseline_query = f"avg:{metric_name}{{service:llm-reliability-control-plane}} by {dimension}"
-            baseline_response = api.Metric.query(
-                start=int(baseline_start.timestamp()),
-                end=int(baseline_end.timestamp()),
-                query=baseline_query
+            anomaly_future = executor.submit(
+                self._query_metric_average, metric_name, analysis_start, analysis_end
+            )
+            analysis_dims_future = executor.submit(
+                self._query_dimension_averages, metric_name, ATTRIBUTION_DIMENSIONS, analysis_start, analysis_end
+            )
+            baseline_dims_future = executor.submit(
+                self._query_dimension_averages, metric_name, ATTRIBUTION_DIMENSIONS, baseline_start, analysis_start
             )
             
-            # Process results
-            analysis_values = {}
-            if 'series' in analysis_response:
-                for series in analysis_response['series']:
-                    tag = series.get('tag_set', [])
-                    dimension_value = next((t.split(':')[1] for t in tag if t.startswith(f"{dimension}:")), "unknown")
-                    if 'pointlist' in series:
-                        values = [p[1] for p in series['pointlist'] if p[1] is not None]
-                        if values:
-                            analysis_values[dimension_value] = sum(values) / len(values)
-            
-            baseline_values = {}
-            if 'series' in baseline_response:
-                for series in baseline_response['series']:
-                    tag = series.get('tag_set', [])
-                    dimension_value = next((t.split(':')[1] for t in tag if t.startswith(f"{dimension}:")), "unknown")
-                    if 'pointlist' in series:
-                        values = [p[1] for p in series['pointlist'] if p[1] is not None]
-                        if values:
-                            baseline_values[dimension_value] = sum(values) / len(values)
-            
-            # Calculate changes
-            all_keys = set(analysis_values.keys()) | set(baseline_values.keys())
-            for key in all_keys:
-                analysis_val = analysis_values.get(key, 0)
-                baseline_val = baseline_values.get(key, 0)
-                change_pct = ((analysis_val - baseline_val) / baseline_val * 100) if baseline_val > 0 else 0
-                
-                breakdown.append({
-                    "name": key,
-                    "baseline_value": baseline_val,
-                    "analysis_value": analysis_val,
-                    "change_pct": change_pct,
-                    "contribution_pct": (analysis_val / sum(analysis_values.values()) * 100) if sum(analysis_values.values()) > 0 else 0
-                })
+            try:
+                comparison = (anomaly_future.result(), baseline_future.result())
+            except Exception as e:
+                logger.warning("Could not fetch metric comparison: %s", e)
+                comparison = (0.0, 0.0)
             
-            return sorted(breakdown, key=lambda x: abs(x['change_pct']), reverse=True)
+            analysis_by_dim = self._resolve_dimension_averages(
+                analysis_dims_future, executor, metric_name, analysis_start, analysis_end
+            )
+            baseline_by_dim = self._resolve_dimension_averages(
+                baseline_dims_future, executor, metric_name, baseline_start, analysis_start
+            )
+        
+        breakdowns = {}
+        for dimension in ATTRIBUTION_DIMENSIONS:
+            if dimension in analysis_by_dim and dimension in baseline_by_dim:
+                breakdowns[dimension] = self._fetch_breakdown_by_dimension(
+                    analysis_by_dim[dimension], baseline_by_dim[dimension]
+                )
+            else:
+                breakdowns[dimension] = []
+        
+        return comparison, breakdowns
+    
+    def _resolve_dimension_averages(
+        self,
+        joint_future: Future,
+        executor: ThreadPoolExecutor,
+        metric_name: str,
+        start: int,
+        end: int
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Return the per-dimension averages of a joint breakdown query.
+        
+        If the joint query failed, each dimension is queried separately; dimensions
+        that still fail are left out of the result.
+        """
+        try:
+            return joint_future.result()
         except Exception as e:
-            logger.warning(f"Could not fetch breakdown by {dimension}: {e}")
+            logger.warning("Joint breakdown query failed, querying dimensions separately: %s", e)
+        
+        futures = {
+            dimension: executor.submit(self._query_dimension_averages, metric_name, (dimension,), start, end)
+            for dimension in ATTRIBUTION_DIMENSIONS
+        }
+        averages = {}
+        for dimension, future in futures.items():
+            try:
+                averages[dimension] = future.result()[dimension]
+            except Exception as e:
+                logger.warning("Could not fetch breakdown by %s: %s", dimension, e)
+        return averages
+    
+    def _query_metric_average(self, metric_name: str, start: int, end: int) -> float:
+        """Query a metric over a window and return the average of all points."""
+        query = self._METRIC_QUERY_TMPL % metric_name
+        return self._cached_query(metric_name, query, start, end, self._average_response)
+    
+    def _query_dimension_averages(
+        self,
+        metric_name: str,
+        dimensions: Tuple[str, ...],
+        start: int,
+        end: int
+    ) -> Dict[str, Dict[str, float]]:
+        """Query a metric grouped by all dimensions at once and return {dimension: {value: average}}."""
+        query = self._BREAKDOWN_QUERY_TMPL % (metric_name, ','.join(dimensions))
+        return self._cached_query(
+            metric_name, query, start, end,
+            lambda response: self._average_response_by_dimensions(response, dimensions)
+        )
+    
+    def _cached_query(
+        self,
+        metric_name: str,
+        query: str,
+        start: int,
+        end: int,
+        reduce: Callable[[Dict[str, Any]], Any]
+    ) -> Any:
+        """
+        Run a Datadog metric query through the TTL cache.
+        
+        The window is snapped to QUERY_BUCKET_SECONDS so overlapping calls hit the
+        same entry, and only the reduced value is cached so hits also skip the
+        averaging work. Failed queries, including error bodies returned by the muted
+        client, raise and are not cached.
+        """
+        start_ts = start // QUERY_BUCKET_SECONDS * QUERY_BUCKET_SECONDS
+        end_ts = end // QUERY_BUCKET_SECONDS * QUERY_BUCKET_SECONDS
+        key = (metric_name, query, start_ts, end_ts)
+        
+        with self._query_cache_lock:
+            entry = self._query_cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._query_cache.move_to_end(key)
+                return entry[1]
+        
+        response = api.Metric.query(start=start_ts, end=end_ts, query=query)
+        if "errors" in response:
+            # The client returns API errors in the body; raise so callers fall back and nothing is cached
+            raise RuntimeError(f"Datadog metric query failed: {response['errors']}")
+        value = reduce(response)
+        
+        with self._query_cache_lock:
+            self._query_cache[key] = (time.monotonic() + QUERY_CACHE_TTL_SECONDS, value)
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > QUERY_CACHE_MAX_ENTRIES:
+                self._query_cache.popitem(last=False)
+        return value
+    
+    def invalidate_query_cache(self, metric_prefix: Optional[str] = None) -> None:
+        """Drop cached query results, optionally only for metrics starting with metric_prefix."""
+        with self._query_cache_lock:
+            if metric_prefix is None:
+                self._query_cache.clear()
+                return
+            for key in [k for k in self._query_cache if k[0].startswith(metric_prefix)]:
+                del self._query_cache[key]
+    
+    @staticmethod
+    def _average_response(response: Dict[str, Any]) -> float:
+        """Average all non-null points across every series of a query response."""
+        series_values = [
+            _pointlist_values(series['pointlist'])
+            for series in response.get('series', [])
+            if 'pointlist' in series
+        ]
+        if not series_values:
+            return 0.0
+        values = np.concatenate(series_values)
+        values = values[~np.isnan(values)]
+        return float(values.mean()) if values.size else 0.0
+    
+    @staticmethod
+    def _average_response_by_dimensions(
+        response: Dict[str, Any],
+        dimensions: Tuple[str, ...]
+    ) -> Dict[str, Dict[str, float]]:
+        """
+        Average the non-null points per dimension value of a grouped query response.
+        
+        Each series is one tag combination; a dimension value's average pools the
+        points of every series carrying that value.
+        """
+        series_tags = []
+        series_values = []
+        for series in response.get('series', []):
+            if 'pointlist' not in series:
+                continue
+            # Parse the tag set once, keeping only the requested dimensions
+            tags = {}
+            for tag in series.get('tag_set', []):
+                key, sep, value = tag.partition(':')
+                if sep and key in dimensions:
+                    tags[key] = value
+            series_tags.append(tags)
+            series_values.append(_pointlist_values(series['pointlist']))
+        if not series_values:
+            return {dimension: {} for dimension in dimensions}
+        
+        # Pad series into one NaN-filled matrix and reduce every series in a single pass
+        matrix = np.full((len(series_values), max(v.size for v in series_values)), np.nan)
+        for row, values in zip(matrix, series_values):
+            row[:values.size] = values
+        valid = ~np.isnan(matrix)
+        counts = valid.sum(axis=1)
+        sums = np.where(valid, matrix, 0.0).sum(axis=1)
+        
+        # Drop series without any non-null point, then group-by each dimension with bincount
+        has_points = counts > 0
+        counts = counts[has_points]
+        sums = sums[has_points]
+        series_tags = [tags for tags, keep in zip(series_tags, has_points.tolist()) if keep]
+        
+        averages = {}
+        for dimension in dimensions:
+            if not series_tags:
+                averages[dimension] = {}
+                continue
+            names, group = np.unique(
+                [tags.get(dimension, "unknown") for tags in series_tags], return_inverse=True
+            )
+            group_means = np.bincount(group, weights=sums) / np.bincount(group, weights=counts)
+            averages[dimension] = dict(zip(names.tolist(), group_means.tolist()))
+        return averages
+    
+    def _fetch_breakdown_by_dimension(
+        self,
+        analysis_values: Dict[str, float],
+        baseline_values: Dict[str, float]
+    ) -> List[Breakdown]:
+        """Build the metric breakdown by dimension (endpoint, model, etc.) from both windows."""
+        names = list(analysis_values.keys() | baseline_values.keys())
+        if not names:
             return []
+        
+        # Column-wise change/contribution math over all dimension values at once
+        analysis = np.array([analysis_values.get(name, 0.0) for name in names], dtype=np.float64)
+        baseline = np.array([baseline_values.get(name, 0.0) for name in names], dtype=np.float64)
+        has_baseline = baseline > 0
+        change = np.where(has_baseline, (analysis - baseline) / np.where(has_baseline, baseline, 1.0) * 100, 0.0)
+        abs_change = np.abs(change)
+        total_analysis = analysis.sum()
+        contribution = analysis / total_analysis * 100 if total_analysis > 0 else np.zeros_like(analysis)
+        
+        # Largest absolute change first; stable so ties keep their order
+        order = np.argsort(-abs_change, kind="stable").tolist()
+        analysis, baseline = analysis.tolist(), baseline.tolist()
+        change, abs_change, contribution = change.tolist(), abs_change.tolist(), contribution.tolist()
+        
+        return [
+            Breakdown(names[i], baseline[i], analysis[i], change[i], abs_change[i], contribution[i])
+            for i in order
+        ]
     
     def _simulate_metric_comparison(self, metric_name: str) -> Tuple[float, float]:
         """Simulate metric comparison for demo."""
@@ -297,23 +496,23 @@ class AnomalyAttributionEngine:
         else:
             return 100.0, 50.0
     
-    def _simulate_breakdown(self, dimension: str) -> List[Dict[str, Any]]:
+    def _simulate_breakdown(self, dimension: str) -> List[Breakdown]:
         """Simulate breakdown for demo."""
         if dimension == "endpoint":
             return [
-                {"name": "/stress", "baseline_value": 0.002, "analysis_value": 0.008, "change_pct": 300.0, "contribution_pct": 45.0},
-                {"name": "/qa", "baseline_value": 0.003, "analysis_value": 0.005, "change_pct": 66.7, "contribution_pct": 30.0},
-                {"name": "/reason", "baseline_value": 0.002, "analysis_value": 0.002, "change_pct": 0.0, "contribution_pct": 15.0},
+                Breakdown("/stress", 0.002, 0.008, 300.0, 300.0, 45.0),
+                Breakdown("/qa", 0.003, 0.005, 66.7, 66.7, 30.0),
+                Breakdown("/reason", 0.002, 0.002, 0.0, 0.0, 15.0),
             ]
         elif dimension == "model":
             return [
-                {"name": "gemini-2.5-flash", "baseline_value": 0.004, "analysis_value": 0.010, "change_pct": 150.0, "contribution_pct": 60.0},
-                {"name": "gemini-1.5-pro", "baseline_value": 0.003, "analysis_value": 0.005, "change_pct": 66.7, "contribution_pct": 40.0},
+                Breakdown("gemini-2.5-flash", 0.004, 0.010, 150.0, 150.0, 60.0),
+                Breakdown("gemini-1.5-pro", 0.003, 0.005, 66.7, 66.7, 40.0),
             ]
         else:
             return [
-                {"name": "stress", "baseline_value": 0.002, "analysis_value": 0.008, "change_pct": 300.0, "contribution_pct": 50.0},
-                {"name": "qa", "baseline_value": 0.003, "analysis_value": 0.004, "change_pct": 33.3, "contribution_pct": 30.0},
+                Breakdown("stress", 0.002, 0.008, 300.0, 300.0, 50.0),
+                Breakdown("qa", 0.003, 0.004, 33.3, 33.3, 30.0),
             ]
     
     def _classify_anomaly_type(self, metric_name: str, change_pct: float) -> str:
@@ -329,51 +528,69 @@ class AnomalyAttributionEngine:
         else:
             return "metric_anomaly"
     
-    def _identify_primary_cause(
+    def _analyze_breakdowns(
+        self,
+        endpoint_breakdown: List[Breakdown],
+        model_breakdown: List[Breakdown],
+        request_type_breakdown: List[Breakdown],
+        total_change_pct: float
+    ) -> Tuple[Dict[str, Any], float, List[Dict[str, Any]]]:
+        """
+        Identify the primary cause and contributing factors in one pass over the breakdowns.
+        
+        The primary cause is the largest significant (>10%) change across all
+        dimensions. Contributing factors are the top three endpoint/model changes
+        above 15%, excluding the primary cause.
+        
+        Returns:
+            (primary_cause, primary_confidence, contributing_factors)
+        """
+        primary_dimension, primary_item = None, None
+        factor_candidates = []
+        for dimension, item in chain(
+            zip(repeat("endpoint"), endpoint_breakdown),
+            zip(repeat("model"), model_breakdown),
+            zip(repeat("request_type"), request_type_breakdown),
+        ):
+            abs_change_pct = item.abs_change_pct
+            if abs_change_pct > 10 and (primary_item is None or abs_change_pct > primary_item.abs_change_pct):
+                primary_dimension, primary_item = dimension, item
+            if abs_change_pct > 15 and dimension != "request_type":
+                factor_candidates.append((dimension, item))
+        
+        primary_cause, primary_confidence = self._describe_primary_cause(
+            primary_dimension, primary_item, total_change_pct
+        )
+        
+        # Exclude primary cause
+        primary_name = primary_cause['name']
+        top_factors = heapq.nlargest(
+            3,
+            (pair for pair in factor_candidates if pair[1].name != primary_name),
+            key=lambda pair: pair[1].abs_change_pct
+        )
+        contributing_factors = [
+            {
+                "dimension": dimension,
+                "name": item.name,
+                "description": f"{item.name} {dimension} contributed {item.contribution_pct:.1f}% with {item.change_pct:.1f}% change",
+                "change_pct": item.change_pct,
+                "contribution_pct": item.contribution_pct,
+                "confidence": min(0.8, 0.4 + (item.contribution_pct / 100) * 0.4)
+            }
+            for dimension, item in top_factors
+        ]
+        
+        return primary_cause, primary_confidence, contributing_factors
+    
+    def _describe_primary_cause(
         self,
-        endpoint_breakdown: List[Dict[str, Any]],
-        model_breakdown: List[Dict[str, Any]],
-        request_type_breakdown: List[Dict[str, Any]],
+        dimension: Optional[str],
+        item: Optional[Breakdown],
         total_change_pct: float
     ) -> Tuple[Dict[str, Any], float]:
-        """Identify the primary cause of the anomaly."""
-        # Find the dimension with the largest change
-        all_changes = []
-        
-        for item in endpoint_breakdown:
-            if abs(item['change_pct']) > 10:  # Significant change
-                all_changes.append({
-                    "dimension": "endpoint",
-                    "name": item['name'],
-                    "change_pct": item['change_pct'],
-                    "contribution_pct": item['contribution_pct'],
-                    "baseline": item['baseline_value'],
-                    "analysis": item['analysis_value']
-                })
-        
-        for item in model_breakdown:
-            if abs(item['change_pct']) > 10:
-                all_changes.append({
-                    "dimension": "model",
-                    "name": item['name'],
-                    "change_pct": item['change_pct'],
-                    "contribution_pct": item['contribution_pct'],
-                    "baseline": item['baseline_value'],
-                    "analysis": item['analysis_value']
-                })
-        
-        for item in request_type_breakdown:
-            if abs(item['change_pct']) > 10:
-                all_changes.append({
-                    "dimension": "request_type",
-                    "name": item['name'],
-                    "change_pct": item['change_pct'],
-                    "contribution_pct": item['contribution_pct'],
-                    "baseline": item['baseline_value'],
-                    "analysis": item['analysis_value']
-                })
-        
-        if not all_changes:
+        """Build the primary cause and its confidence from the selected breakdown item."""
+        if item is None:
             return {
                 "dimension": "unknown",
                 "name": "unknown",
@@ -381,59 +598,24 @@ class AnomalyAttributionEngine:
                 "change_pct": total_change_pct
             }, 0.3
         
-        # Sort by absolute change
-        primary = max(all_changes, key=lambda x: abs(x['change_pct']))
+        change_pct = item.change_pct
+        abs_change_pct = item.abs_change_pct
         
         # Calculate confidence based on contribution and change magnitude
-        confidence = min(0.95, 0.5 + (primary['contribution_pct'] / 100) * 0.3 + (min(abs(primary['change_pct']), 200) / 200) * 0.15)
+        confidence = min(0.95, 0.5 + (item.contribution_pct / 100) * 0.3 + (min(abs_change_pct, 200) / 200) * 0.15)
         
-        description = f"Anomaly caused by {abs(primary['change_pct']):.1f}% {'increase' if primary['change_pct'] > 0 else 'decrease'} in {primary['dimension']} '{primary['name']}'"
+        description = f"Anomaly caused by {abs_change_pct:.1f}% {'increase' if change_pct > 0 else 'decrease'} in {dimension} '{item.name}'"
         
         return {
-            "dimension": primary['dimension'],
-            "name": primary['name'],
+            "dimension": dimension,
+            "name": item.name,
             "description": description,
-            "change_pct": primary['change_pct'],
-            "contribution_pct": primary['contribution_pct'],
-            "baseline_value": primary['baseline'],
-            "analysis_value": primary['analysis']
+            "change_pct": change_pct,
+            "contribution_pct": item.contribution_pct,
+            "baseline_value": item.baseline_value,
+            "analysis_value": item.analysis_value
         }, confidence
     
-    def _identify_contributing_factors(
-        self,
-        endpoint_breakdown: List[Dict[str, Any]],
-        model_breakdown: List[Dict[str, Any]],
-        request_type_breakdown: List[Dict[str, Any]],
-        primary_cause: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
-        """Identify contributing factors (secondary causes)."""
-        factors = []
-        
-        # Exclude primary cause
-        for item in endpoint_breakdown:
-            if item['name'] != primary_cause.get('name') and abs(item['change_pct']) > 15:
-                factors.append({
-                    "dimension": "endpoint",
-                    "name": item['name'],
-                    "description": f"{item['name']} endpoint contributed {item['contribution_pct']:.1f}% with {item['change_pct']:.1f}% change",
-                    "change_pct": item['change_pct'],
-                    "contribution_pct": item['contribution_pct'],
-                    "confidence": min(0.8, 0.4 + (item['contribution_pct'] / 100) * 0.4)
-                })
-        
-        for item in model_breakdown:
-            if item['name'] != primary_cause.get('name') and abs(item['change_pct']) > 15:
-                factors.append({
-                    "dimension": "model",
-                    "name": item['name'],
-                    "description": f"{item['name']} model contributed {item['contribution_pct']:.1f}% with {item['change_pct']:.1f}% change",
-                    "change_pct": item['change_pct'],
-                    "contribution_pct": item['contribution_pct'],
-                    "confidence": min(0.8, 0.4 + (item['contribution_pct'] / 100) * 0.4)
-                })
-        
-        return sorted(factors, key=lambda x: abs(x['change_pct']), reverse=True)[:3]
-    
     def _calculate_total_confidence(
         self,
         primary_confidence: float,
@@ -457,20 +639,14 @@ class AnomalyAttributionEngine:
     
     def _determine_severity(self, change_pct: float, anomaly_type: str) -> str:
         """Determine severity based on change percentage."""
-        abs_change = abs(change_pct)
-        
-        if abs_change > 200:
-            return "critical"
-        elif abs_change > 100:
-            return "high"
-        elif abs_change > 50:
-            return "medium"
-        else:
-            return "low"
+        return SEVERITY_LEVELS[bisect.bisect_left(SEVERITY_THRESHOLDS, abs(change_pct))]
     
     def generate_attribution_report(self, attribution: AnomalyAttribution) -> Dict[str, Any]:
-        """Generate a human-readable attribution report."""
-        return {
+        """Generate a human-readable attribution report (built once per attribution)."""
+        if attribution._report_cache is not None:
+            return attribution._report_cache
+        
+        report = {
             "anomaly_id": attribution.anomaly_id,
             "anomaly_type": attribution.anomaly_type,
             "detected_at": attribution.detected_at,
@@ -505,6 +681,9 @@ class AnomalyAttributionEngine:
             },
             "time_window": attribution.time_window
         }
+        # Frozen dataclass: bypass __setattr__ to memoize the report
+        object.__setattr__(attribution, "_report_cache", report)
+        return report
 
 
 # Global instance
@@ -0,0 +1,17 @@
+"""
+Running blocking calls from async request handlers.
+
+The Datadog SDK and requests sessions are blocking; the *_async variants of the integrations
+run them in the default executor so a handler can await them (or several at once with
+asyncio.gather) without stalling the event loop.
+"""
+
+import asyncio
+import functools
+from typing import Any, Callable
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run func(*args, **kwargs) in the default executor and return its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
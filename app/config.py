@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 try:
     from pydantic_settings import BaseSettings
 except ImportError:
@@ -34,6 +36,8 @@ class Settings(BaseSettings):
         extra = "allow"  # Allow extra fields from environment
 
 
-settings = Settings()
-
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, parsing the environment/.env on first use only."""
+    return Settings()
 
@@ -6,13 +6,23 @@ Shows: "This recommendation saved $1,234 in the last 7 days"
 """
 
 import os
+import atexit
+import itertools
 import json
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+import threading
+import time
+from collections import defaultdict, deque
+from functools import cached_property, lru_cache
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from dataclasses import dataclass, fields
 from pathlib import Path
 
+import numpy as np
+
+from .singleton import LazySingleton
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -22,6 +32,97 @@ except ImportError:
     DD_API_AVAILABLE = False
     logger.warning("Datadog API not available. Install: pip install datadog")
 
+# Datadog credentials, read from the environment once at import
+_DD_API_KEY = os.getenv("DD_API_KEY") or os.getenv("LRCP_DATADOG_API_KEY")
+_DD_APP_KEY = os.getenv("DD_APP_KEY")
+
+# Cost and request count are fetched together as one comma-separated multi-series query
+COST_METRIC = "llm.cost.usd"
+REQUEST_COUNT_METRIC = "llm.request.count"
+COST_AND_COUNT_QUERY = (
+    f"sum:{COST_METRIC}{{service:llm-reliability-control-plane}},"
+    f"sum:{REQUEST_COUNT_METRIC}{{service:llm-reliability-control-plane}}"
+)
+
+# Metric queries are memoized per rounded window; the memo is dropped after the TTL
+QUERY_BUCKET_SECONDS = 60
+QUERY_CACHE_TTL_SECONDS = 300
+_query_cache_cleared_at = time.monotonic()
+
+# History writes are coalesced: at most one flush per interval, the rest by the background flusher
+HISTORY_FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class _NullStatsd:
+    """Stand-in for statsd when Datadog is disabled, so emission sites need no guard."""
+
+    def gauge(self, *args, **kwargs):
+        pass
+
+    def increment(self, *args, **kwargs):
+        pass
+
+    def histogram(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def _epoch_seconds(value: datetime) -> float:
+    """Epoch seconds of a datetime, treating naive values as UTC so naive ordering is kept."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _bucket_timestamp(value: datetime) -> int:
+    """Round a datetime to the nearest QUERY_BUCKET_SECONDS epoch bucket."""
+    return round(value.timestamp() / QUERY_BUCKET_SECONDS) * QUERY_BUCKET_SECONDS
+
+
+def _expire_query_caches() -> None:
+    """Clear the memoized Datadog queries once they are older than the TTL."""
+    global _query_cache_cleared_at
+    now = time.monotonic()
+    if now - _query_cache_cleared_at > QUERY_CACHE_TTL_SECONDS:
+        _cost_and_count_query_cached.cache_clear()
+        _query_cache_cleared_at = now
+
+
+def _pointlist_values(pointlist: List[List[Any]]) -> np.ndarray:
+    """Return the values of a Datadog pointlist as float64, with null points as NaN."""
+    if not pointlist:
+        return np.empty(0, dtype=np.float64)
+    return np.array(pointlist, dtype=np.float64)[:, 1]
+
+
+@lru_cache(maxsize=512)
+def _cost_and_count_query_cached(start_bucket: int, end_bucket: int, query: str) -> Tuple[float, int]:
+    """Sum the cost and request count points of a fused query over a bucketed window."""
+    response = api.Metric.query(start=start_bucket, end=end_bucket, query=query)
+    if "errors" in response:
+        # The client returns API errors in the body; raise so they are never cached
+        raise RuntimeError(f"Datadog metric query failed: {response['errors']}")
+    
+    # Each returned series belongs to one of the fused queries; route its points by metric name.
+    # Null points become NaN and are skipped by nansum; counts truncate per point like int().
+    total_cost = 0.0
+    total_count = 0
+    if 'series' in response:
+        for series in response['series']:
+            if 'pointlist' not in series:
+                continue
+            metric = series.get('metric')
+            if metric == COST_METRIC:
+                total_cost += float(np.nansum(_pointlist_values(series['pointlist'])))
+            elif metric == REQUEST_COUNT_METRIC:
+                total_count += int(np.nansum(np.trunc(_pointlist_values(series['pointlist']))))
+    return total_cost, total_count
+
 
 @dataclass
 class OptimizationRecommendation:
@@ -37,6 +138,20 @@ class OptimizationRecommendation:
     implemented_at: Optional[str] = None
     status: str = "pending"  # "pending", "implemented", "rejected", "expired"
     implementation_cost: float = 0.0  # Cost to implement (e.g., dev time)
+    
+    # Metric tags are built once per recommendation. cached_property stores them in the
+    # instance __dict__, so they are not dataclass fields and are not persisted.
+    @cached_property
+    def _tags_created(self) -> Tuple[str, ...]:
+        return (f'category:{self.category}', f'priority:{self.priority}')
+    
+    @cached_property
+    def _tags_implemented(self) -> Tuple[str, ...]:
+        return (f'category:{self.category}', f'id:{self.id}')
+    
+    @cached_property
+    def _tags_result(self) -> Tuple[str, ...]:
+        return (f'recommendation_id:{self.id}',)
 
 
 @dataclass
@@ -51,6 +166,27 @@ class OptimizationResult:
     request_count: int
     roi_percentage: float
     confidence_score: float  # How confident we are in the attribution
+    
+    # Epoch seconds of the period bounds, so reports compare numbers instead of parsing ISO strings
+    period_start_ts: Optional[float] = None
+    period_end_ts: Optional[float] = None
+    
+    def __post_init__(self):
+        # Records saved before these fields existed only carry the ISO strings
+        if self.period_start_ts is None:
+            self.period_start_ts = _epoch_seconds(datetime.fromisoformat(self.period_start))
+        if self.period_end_ts is None:
+            self.period_end_ts = _epoch_seconds(datetime.fromisoformat(self.period_end))
+
+
+# Persisted field names. Both dataclasses are flat, so a record is plain attribute reads;
+# asdict() would recursively deep-copy every value on each save.
+_RECOMMENDATION_FIELDS = tuple(f.name for f in fields(OptimizationRecommendation))
+_RESULT_FIELDS = tuple(f.name for f in fields(OptimizationResult))
+
+
+def _to_record(obj: Any, field_names: Tuple[str, ...]) -> Dict[str, Any]:
+    return {name: getattr(obj, name) for name in field_names}
 
 
 class CostOptimizationEngine:
@@ -67,11 +203,14 @@ class CostOptimizationEngine:
     def __init__(self, storage_path: str = "data/optimization_history.json"):
         self.storage_path = Path(storage_path)
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        # Results are append-only, so they live in a JSONL file that only ever grows by new lines;
+        # the (small) recommendations file is still rewritten whole
+        self.results_path = self.storage_path.with_suffix('.results.jsonl')
         
         # Initialize Datadog if available
         if DD_API_AVAILABLE:
-            self.api_key = os.getenv("DD_API_KEY") or os.getenv("LRCP_DATADOG_API_KEY")
-            self.app_key = os.getenv("DD_APP_KEY")
+            self.api_key = _DD_API_KEY
+            self.app_key = _DD_APP_KEY
             if self.api_key and self.app_key:
                 api._api_key = self.api_key
                 api._application_key = self.app_key
@@ -80,42 +219,154 @@ class CostOptimizationEngine:
                 self.datadog_enabled = False
         else:
             self.datadog_enabled = False
+        self.statsd = statsd if self.datadog_enabled else _NullStatsd()
         
         # Load existing history
         self.recommendations: Dict[str, OptimizationRecommendation] = {}
         self.results: List[OptimizationResult] = []
+        # recommendation id -> indexes into self.results, for O(1) per-recommendation lookups
+        self._results_by_rec: Dict[str, List[int]] = defaultdict(list)
+        # Column (SoA) view of self.results for vectorized reports. Rows are appended in the same
+        # pass that records a result; the NumPy arrays are rebuilt from them lazily after appends.
+        self._result_rows: Dict[str, List[Any]] = {
+            "savings": [], "requests": [], "roi": [], "period_end_ts": [], "category_idx": []
+        }
+        # category -> integer code, in order of first appearance across all results
+        self._category_codes: Dict[Optional[str], int] = {}
+        self._result_columns_cache: Optional[Dict[str, Any]] = None
+        # (category, title, description) -> id of the latest recommendation with that content
+        self._rec_content_index: Dict[Tuple[str, str, str], str] = {}
+        
+        # Debounced persistence: recommendation changes mark the history dirty and new results
+        # queue for appending; both are flushed at most once per interval, by the next mutation
+        # or the background flusher
+        self._dirty = False
+        self._pending_results: deque = deque()
+        # Set when the results file does not end in a newline, so the next append starts a fresh line
+        self._results_need_newline = False
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+        self._stop_flusher = threading.Event()
+        
         self._load_history()
+        # Suffix for recommendation ids; next() on a count is atomic, unlike len(self.recommendations)
+        self._id_counter = itertools.count(len(self.recommendations))
+        
+        threading.Thread(target=self._flush_loop, name="optimization-history-flush", daemon=True).start()
+        atexit.register(self._flush_now)
     
     def _load_history(self):
         """Load optimization history from storage."""
+        legacy_results = []
         try:
             if self.storage_path.exists():
-                with open(self.storage_path, 'r') as f:
-                    data = json.load(f)
-                    # Load recommendations
-                    for rec_data in data.get('recommendations', []):
-                        rec = OptimizationRecommendation(**rec_data)
-                        self.recommendations[rec.id] = rec
-                    # Load results
-                    for result_data in data.get('results', []):
-                        result = OptimizationResult(**result_data)
-                        self.results.append(result)
-                logger.info(f"Loaded {len(self.recommendations)} recommendations and {len(self.results)} results")
+                data = json.loads(self.storage_path.read_bytes())
+                # Load recommendations
+                for rec_data in data.get('recommendations', []):
+                    rec = OptimizationRecommendation(**rec_data)
+                    self.recommendations[rec.id] = rec
+                    self._rec_content_index[(rec.category, rec.title, rec.description)] = rec.id
+                # Files written before the JSONL split keep their results inline
+                legacy_results = data.get('results', [])
         except Exception as e:
             logger.warning(f"Could not load optimization history: {e}")
-    
-    def _save_history(self):
-        """Save optimization history to storage."""
+        
         try:
-            data = {
-                'recommendations': [asdict(rec) for rec in self.recommendations.values()],
-                'results': [asdict(result) for result in self.results],
-                'last_updated': datetime.now().isoformat()
-            }
-            with open(self.storage_path, 'w') as f:
-                json.dump(data, f, indent=2)
+            if self.results_path.exists():
+                with open(self.results_path, encoding='utf-8') as f:
+                    for line_number, line in enumerate(f, 1):
+                        self._results_need_newline = not line.endswith('\n')
+                        if not line.strip():
+                            continue
+                        try:
+                            self._append_result(OptimizationResult(**json.loads(line)))
+                        except (ValueError, TypeError) as e:
+                            # A crash mid-append can leave a torn last line
+                            logger.warning(f"Skipping unreadable optimization result on line {line_number}: {e}")
+            elif legacy_results:
+                # Migrate: queue inline results for the JSONL file and rewrite the recommendations without them
+                for result_data in legacy_results:
+                    result = OptimizationResult(**result_data)
+                    self._append_result(result)
+                    self._pending_results.append(result)
+                self._dirty = True
+            logger.info(f"Loaded {len(self.recommendations)} recommendations and {len(self.results)} results")
         except Exception as e:
-            logger.warning(f"Could not save optimization history: {e}")
+            logger.warning(f"Could not load optimization results: {e}")
+    
+    def _append_result(self, result: OptimizationResult):
+        """Add a result to the list, its per-recommendation index and the report columns."""
+        self._results_by_rec[result.recommendation_id].append(len(self.results))
+        self.results.append(result)
+        
+        rec = self.recommendations.get(result.recommendation_id)
+        category = rec.category if rec is not None else None
+        code = self._category_codes.setdefault(category, len(self._category_codes))
+        rows = self._result_rows
+        rows["savings"].append(result.actual_savings)
+        rows["requests"].append(result.request_count)
+        rows["roi"].append(result.roi_percentage)
+        rows["period_end_ts"].append(result.period_end_ts)
+        rows["category_idx"].append(code)
+        self._result_columns_cache = None
+    
+    def _mark_dirty(self):
+        """Record that recommendations changed; write now only if the last flush is old enough."""
+        self._dirty = True
+        self._maybe_flush()
+    
+    def _queue_result(self, result: OptimizationResult):
+        """Queue a new result for appending; write now only if the last flush is old enough."""
+        self._pending_results.append(result)
+        self._maybe_flush()
+    
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush > HISTORY_FLUSH_INTERVAL_SECONDS:
+            self._flush_now()
+    
+    def _flush_loop(self):
+        """Background flusher for mutations coalesced by _mark_dirty and _queue_result."""
+        while not self._stop_flusher.wait(HISTORY_FLUSH_INTERVAL_SECONDS):
+            if self._dirty or self._pending_results:
+                self._flush_now()
+    
+    def _flush_now(self):
+        """Append queued results and rewrite the recommendations if they changed since the last flush."""
+        with self._flush_lock:
+            pending = []
+            while self._pending_results:
+                pending.append(self._pending_results.popleft())
+            if not pending and not self._dirty:
+                return
+            self._last_flush = time.monotonic()
+            
+            if pending:
+                try:
+                    lines = ''.join(json.dumps(_to_record(result, _RESULT_FIELDS)) + '\n' for result in pending)
+                    if self._results_need_newline:
+                        lines = '\n' + lines
+                    with open(self.results_path, 'a', encoding='utf-8') as f:
+                        f.write(lines)
+                    self._results_need_newline = False
+                except Exception as e:
+                    self._pending_results.extendleft(reversed(pending))
+                    logger.warning(f"Could not append optimization results: {e}")
+            
+            if self._dirty:
+                self._dirty = False
+                try:
+                    data = {
+                        'recommendations': [_to_record(rec, _RECOMMENDATION_FIELDS) for rec in list(self.recommendations.values())],
+                        'last_updated': datetime.now().isoformat()
+                    }
+                    # Compact output keeps json on its C encoder (indent forces the pure-Python one).
+                    # Write a temp file and swap it in so a crash never leaves a truncated history.
+                    tmp_path = self.storage_path.with_suffix('.tmp')
+                    tmp_path.write_text(json.dumps(data))
+                    os.replace(tmp_path, self.storage_path)
+                except Exception as e:
+                    self._dirty = True
+                    logger.warning(f"Could not save optimization history: {e}")
     
     def create_recommendation(
         self,
@@ -130,10 +381,27 @@ class CostOptimizationEngine:
         """
         Create a new cost optimization recommendation.
         
+        If a pending recommendation with the same category, title and description
+        already exists, that recommendation is returned instead of a duplicate.
+        
         Returns:
             OptimizationRecommendation with generated ID
         """
-        rec_id = f"opt-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{len(self.recommendations)}"
+        content_key = (category, title, description)
+        existing_id = self._rec_content_index.get(content_key)
+        if existing_id is not None and self.recommendations[existing_id].status == "pending":
+            try:
+                self.statsd.increment(
+                    'llm.optimization.recommendation.duplicate_suppressed',
+                    tags=[f'category:{category}']
+                )
+            except Exception as e:
+                logger.warning(f"Could not emit Datadog metric: {e}")
+            logger.info(f"Skipped duplicate optimization recommendation: {existing_id} - {title}")
+            return self.recommendations[existing_id]
+        
+        now = datetime.now()
+        rec_id = f"opt-{now.strftime('%Y%m%d-%H%M%S')}-{next(self._id_counter)}"
         
         recommendation = OptimizationRecommendation(
             id=rec_id,
@@ -143,23 +411,23 @@ class CostOptimizationEngine:
             estimated_savings_per_request=estimated_savings_per_request,
             estimated_savings_percentage=estimated_savings_percentage,
             priority=priority,
-            created_at=datetime.now().isoformat(),
+            created_at=now.isoformat(),
             implementation_cost=implementation_cost
         )
         
         self.recommendations[rec_id] = recommendation
-        self._save_history()
+        self._rec_content_index[content_key] = rec_id
+        self._mark_dirty()
         
         # Emit metric to Datadog
-        if self.datadog_enabled:
-            try:
-                statsd.gauge(
-                    'llm.optimization.recommendation.created',
-                    1,
-                    tags=[f'category:{category}', f'priority:{priority}']
-                )
-            except Exception as e:
-                logger.warning(f"Could not emit Datadog metric: {e}")
+        try:
+            self.statsd.gauge(
+                'llm.optimization.recommendation.created',
+                1,
+                tags=list(recommendation._tags_created)
+            )
+        except Exception as e:
+            logger.warning(f"Could not emit Datadog metric: {e}")
         
         logger.info(f"Created optimization recommendation: {rec_id} - {title}")
         return recommendation
@@ -191,18 +459,17 @@ class CostOptimizationEngine:
         # Store baseline metrics for later comparison
         recommendation.baseline_metrics = baseline_metrics
         
-        self._save_history()
+        self._mark_dirty()
         
         # Emit metric to Datadog
-        if self.datadog_enabled:
-            try:
-                statsd.gauge(
-                    'llm.optimization.recommendation.implemented',
-                    1,
-                    tags=[f'category:{recommendation.category}', f'id:{recommendation_id}']
-                )
-            except Exception as e:
-                logger.warning(f"Could not emit Datadog metric: {e}")
+        try:
+            self.statsd.gauge(
+                'llm.optimization.recommendation.implemented',
+                1,
+                tags=list(recommendation._tags_implemented)
+            )
+        except Exception as e:
+            logger.warning(f"Could not emit Datadog metric: {e}")
         
         logger.info(f"Implemented optimization recommendation: {recommendation_id}")
         return recommendation
@@ -244,6 +511,10 @@ class CostOptimizationEngine:
         period_end = datetime.now()
         period_start = period_end - timedelta(days=period_days)
         
+        # Anything not provided comes from a single Datadog round trip for cost and request count
+        if after_cost is None or request_count is None or (before_cost is None and not request_count):
+            fetched_cost, fetched_count = self._fetch_cost_and_count_from_datadog(period_start, period_end)
+        
         # If costs not provided, try to fetch from Datadog or calculate
         if before_cost is None:
             baseline = getattr(recommendation, 'baseline_metrics', {})
@@ -252,13 +523,13 @@ class CostOptimizationEngine:
                 before_cost = baseline_cost_per_request * request_count
             else:
                 # Fetch from Datadog
-                before_cost = self._fetch_cost_from_datadog(period_start, period_end, before_optimization=True)
+                before_cost = fetched_cost
         
         if after_cost is None:
-            after_cost = self._fetch_cost_from_datadog(period_start, period_end, before_optimization=False)
+            after_cost = fetched_cost
         
         if request_count is None:
-            request_count = self._fetch_request_count_from_datadog(period_start, period_end)
+            request_count = fetched_count
         
         # Calculate actual savings
         actual_savings = before_cost - after_cost
@@ -275,6 +546,8 @@ class CostOptimizationEngine:
             recommendation_id=recommendation_id,
             period_start=period_start.isoformat(),
             period_end=period_end.isoformat(),
+            period_start_ts=_epoch_seconds(period_start),
+            period_end_ts=_epoch_seconds(period_end),
             before_cost=before_cost,
             after_cost=after_cost,
             actual_savings=actual_savings,
@@ -283,86 +556,41 @@ class CostOptimizationEngine:
             confidence_score=confidence_score
         )
         
-        self.results.append(result)
-        self._save_history()
+        self._append_result(result)
+        self._queue_result(result)
         
         # Emit metrics to Datadog
-        if self.datadog_enabled:
-            try:
-                statsd.gauge('llm.optimization.savings.total', actual_savings, tags=[f'recommendation_id:{recommendation_id}'])
-                statsd.gauge('llm.optimization.roi.percentage', roi_percentage, tags=[f'recommendation_id:{recommendation_id}'])
-                statsd.gauge('llm.optimization.savings.confidence', confidence_score, tags=[f'recommendation_id:{recommendation_id}'])
-            except Exception as e:
-                logger.warning(f"Could not emit Datadog metrics: {e}")
+        try:
+            # statsd appends its constant tags with list +, so pass a list rather than the cached tuple
+            tags = list(recommendation._tags_result)
+            # Buffer the three gauges so they go out in a single datagram
+            with self.statsd as dd:
+                dd.gauge('llm.optimization.savings.total', actual_savings, tags=tags)
+                dd.gauge('llm.optimization.roi.percentage', roi_percentage, tags=tags)
+                dd.gauge('llm.optimization.savings.confidence', confidence_score, tags=tags)
+        except Exception as e:
+            logger.warning(f"Could not emit Datadog metrics: {e}")
         
         logger.info(f"Recorded optimization result: {recommendation_id} - Saved ${actual_savings:.2f} ({roi_percentage:.1f}% ROI)")
         return result
     
-    def _fetch_cost_from_datadog(
-        self,
-        start_time: datetime,
-        end_time: datetime,
-        before_optimization: bool = False
-    ) -> float:
-        """Fetch total cost from Datadog for a time period."""
-        if not self.datadog_enabled:
-            return 0.0
-        
-        try:
-            # Query Datadog for cost metrics
-            query = f"sum:llm.cost.usd{{service:llm-reliability-control-plane}}"
-            
-            # Use Datadog API to query metrics
-            response = api.Metric.query(
-                start=int(start_time.timestamp()),
-                end=int(end_time.timestamp()),
-                query=query
-            )
-            
-            # Sum up all cost values
-            total_cost = 0.0
-            if 'series' in response:
-                for series in response['series']:
-                    if 'pointlist' in series:
-                        for point in series['pointlist']:
-                            if point[1] is not None:
-                                total_cost += point[1]
-            
-            return total_cost
-        except Exception as e:
-            logger.warning(f"Could not fetch cost from Datadog: {e}")
-            return 0.0
-    
-    def _fetch_request_count_from_datadog(
+    def _fetch_cost_and_count_from_datadog(
         self,
         start_time: datetime,
         end_time: datetime
-    ) -> int:
-        """Fetch request count from Datadog for a time period."""
+    ) -> Tuple[float, int]:
+        """Fetch total cost and request count from Datadog for a time period in one query."""
         if not self.datadog_enabled:
-            return 0
+            return 0.0, 0
         
         try:
-            query = f"sum:llm.request.count{{service:llm-reliability-control-plane}}"
-            
-            response = api.Metric.query(
-                start=int(start_time.timestamp()),
-                end=int(end_time.timestamp()),
-                query=query
+            _expire_query_caches()
+            return _cost_and_count_query_cached(
+                _bucket_timestamp(start_time), _bucket_timestamp(end_time), COST_AND_COUNT_QUERY
             )
-            
-            total_count = 0
-            if 'series' in response:
-                for series in response['series']:
-                    if 'pointlist' in series:
-                        for point in series['pointlist']:
-                            if point[1] is not None:
-                                total_count += int(point[1])
-            
-            return total_count
         except Exception as e:
-            logger.warning(f"Could not fetch request count from Datadog: {e}")
-            return 0
+            logger.warning(f"Could not fetch cost and request count from Datadog: {e}")
+            return 0.0, 0
     
     def get_roi_report(
         self,
@@ -380,15 +608,15 @@ class CostOptimizationEngine:
             - ROI breakdown
         """
         cutoff_date = datetime.now() - timedelta(days=days)
+        columns = self._result_columns()
         
         # Filter results by date and category
-        relevant_results = [
-            r for r in self.results
-            if datetime.fromisoformat(r.period_end) >= cutoff_date
-            and (category is None or self.recommendations[r.recommendation_id].category == category)
-        ]
+        mask = columns["period_end_ts"] >= _epoch_seconds(cutoff_date)
+        if category is not None:
+            mask &= columns["category_idx"] == self._category_codes.get(category, -1)
+        indices = np.flatnonzero(mask)
         
-        if not relevant_results:
+        if not indices.size:
             return {
                 "period_days": days,
                 "total_savings": 0.0,
@@ -400,23 +628,29 @@ class CostOptimizationEngine:
                 "message": f"No optimization results found in the last {days} days"
             }
         
-        # Calculate totals
-        total_savings = sum(r.actual_savings for r in relevant_results)
-        total_requests = sum(r.request_count for r in relevant_results)
+        savings = columns["savings"][indices]
+        category_idx = columns["category_idx"][indices]
         
-        # Group by category
-        savings_by_category: Dict[str, float] = {}
-        for result in relevant_results:
-            rec = self.recommendations[result.recommendation_id]
-            category_name = rec.category
-            savings_by_category[category_name] = savings_by_category.get(category_name, 0) + result.actual_savings
+        # Calculate totals
+        total_savings = float(savings.sum())
+        total_requests = int(columns["requests"][indices].sum())
+        
+        # Group by category, keeping categories in order of first appearance
+        category_totals = np.bincount(category_idx, weights=savings)
+        present, first_seen = np.unique(category_idx, return_index=True)
+        savings_by_category = {
+            columns["category_table"][idx]: float(category_totals[idx])
+            for idx in present[np.argsort(first_seen)].tolist()
+        }
         
-        # Top performing recommendations
-        top_recommendations = sorted(
-            relevant_results,
-            key=lambda x: x.actual_savings,
-            reverse=True
-        )[:5]
+        # Top performing recommendations (largest savings first, ties in original order)
+        top_count = min(5, indices.size)
+        kth_largest = np.partition(savings, savings.size - top_count)[savings.size - top_count]
+        above = np.flatnonzero(savings > kth_largest)
+        ties = np.flatnonzero(savings == kth_largest)[:top_count - above.size]
+        top = np.concatenate([above, ties])
+        top = top[np.lexsort((top, -savings[top]))]
+        top_recommendations = [self.results[i] for i in indices[top].tolist()]
         
         top_recommendations_list = []
         for result in top_recommendations:
@@ -427,20 +661,22 @@ class CostOptimizationEngine:
                 "category": rec.category,
                 "savings": result.actual_savings,
                 "roi_percentage": result.roi_percentage,
-                "period_days": (datetime.fromisoformat(result.period_end) - datetime.fromisoformat(result.period_start)).days,
+                "period_days": int((result.period_end_ts - result.period_start_ts) // 86400),
                 "confidence": result.confidence_score,
                 "message": f"This recommendation saved ${result.actual_savings:.2f} in the last {days} days"
             })
         
-        # Average ROI
-        rois = [r.roi_percentage for r in relevant_results if r.roi_percentage != float('inf')]
-        average_roi = sum(rois) / len(rois) if rois else 0.0
+        # Average ROI over finite values, summed in place rather than through a filtered copy
+        rois = columns["roi"][indices]
+        finite = rois != float('inf')
+        finite_count = np.count_nonzero(finite)
+        average_roi = float(rois.sum(where=finite)) / finite_count if finite_count else 0.0
         
         report = {
             "period_days": days,
             "total_savings": round(total_savings, 2),
             "total_requests": total_requests,
-            "recommendations_count": len(relevant_results),
+            "recommendations_count": int(indices.size),
             "top_recommendations": top_recommendations_list,
             "savings_by_category": {k: round(v, 2) for k, v in savings_by_category.items()},
             "average_roi": round(average_roi, 1),
@@ -449,13 +685,32 @@ class CostOptimizationEngine:
         
         return report
     
+    def _result_columns(self) -> Dict[str, Any]:
+        """
+        Return the hot OptimizationResult fields as parallel NumPy arrays.
+        
+        Converted once from the rows appended by _append_result and reused until the
+        next result is recorded, so report filtering, grouping and top-K run as array operations.
+        """
+        if self._result_columns_cache is None:
+            rows = self._result_rows
+            self._result_columns_cache = {
+                "savings": np.array(rows["savings"], dtype=np.float64),
+                "requests": np.array(rows["requests"], dtype=np.int64),
+                "roi": np.array(rows["roi"], dtype=np.float64),
+                "period_end_ts": np.array(rows["period_end_ts"], dtype=np.float64),
+                "category_idx": np.array(rows["category_idx"], dtype=np.int64),
+                "category_table": list(self._category_codes),
+            }
+        return self._result_columns_cache
+    
     def get_recommendation_history(self) -> List[Dict[str, Any]]:
         """Get all recommendations with their status and results."""
         history = []
         
         for rec_id, rec in self.recommendations.items():
             # Find results for this recommendation
-            rec_results = [r for r in self.results if r.recommendation_id == rec_id]
+            rec_results = [self.results[i] for i in self._results_by_rec.get(rec_id, ())]
             
             history.append({
                 "id": rec.id,
@@ -477,13 +732,10 @@ class CostOptimizationEngine:
 
 
 # Global instance
-_optimization_engine: Optional[CostOptimizationEngine] = None
+_optimization_engine = LazySingleton(CostOptimizationEngine)
 
 
 def get_optimization_engine() -> CostOptimizationEngine:
     """Get or create the global optimization engine instance."""
-    global _optimization_engine
-    if _optimization_engine is None:
-        _optimization_engine = CostOptimizationEngine()
-    return _optimization_engine
+    return _optimization_engine.get()
 
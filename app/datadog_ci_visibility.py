@@ -6,10 +6,17 @@ Tracks CI/CD pipelines, test results, and deployments.
 """
 
 import os
+import atexit
 import logging
-from typing import Dict, List, Any, Optional
+import queue
+import threading
+import uuid
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+from .singleton import LazySingleton
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -19,6 +26,33 @@ except ImportError:
     DD_API_AVAILABLE = False
     logger.warning("Datadog API not available. Install: pip install datadog")
 
+# Datadog credentials, read from the environment once at import
+_DD_API_KEY = os.getenv("DD_API_KEY") or os.getenv("LRCP_DATADOG_API_KEY")
+_DD_APP_KEY = os.getenv("DD_APP_KEY")
+
+# Deployment events are posted by a background worker; beyond this backlog new events are rejected
+EVENT_QUEUE_MAX_SIZE = 1024
+
+
+# Metadata values that become tags; the set gives an exact-type fast path before isinstance
+_SCALAR_TAG_TYPES = (str, int, float, bool)
+_SCALAR_TAG_TYPE_SET = frozenset(_SCALAR_TAG_TYPES)
+
+
+def _metadata_tags(metadata: Dict[str, Any]) -> List[str]:
+    """Format the scalar metadata entries as key:value tags."""
+    return [
+        f"{key}:{value}"
+        for key, value in metadata.items()
+        if type(value) in _SCALAR_TAG_TYPE_SET or isinstance(value, _SCALAR_TAG_TYPES)
+    ]
+
+
+@lru_cache(maxsize=32)
+def _service_tags(service: str) -> Tuple[str, ...]:
+    """Tags shared by every CI metric of a service, formatted once per service."""
+    return (f"service:{service}", "ci_visibility")
+
 
 class CIVisibilityIntegration:
     """
@@ -29,8 +63,8 @@ class CIVisibilityIntegration:
     
     def __init__(self):
         if DD_API_AVAILABLE:
-            self.api_key = os.getenv("DD_API_KEY") or os.getenv("LRCP_DATADOG_API_KEY")
-            self.app_key = os.getenv("DD_APP_KEY")
+            self.api_key = _DD_API_KEY
+            self.app_key = _DD_APP_KEY
             if self.api_key and self.app_key:
                 api._api_key = self.api_key
                 api._application_key = self.app_key
@@ -39,6 +73,38 @@ class CIVisibilityIntegration:
                 self.enabled = False
         else:
             self.enabled = False
+        
+        # Event.create is a blocking HTTP call, so deployments only enqueue the event
+        self._event_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=EVENT_QUEUE_MAX_SIZE)
+        if self.enabled:
+            threading.Thread(target=self._event_worker, name="ci-visibility-events", daemon=True).start()
+            atexit.register(self._drain_events)
+    
+    def _post_event(self, event_data: Dict[str, Any]) -> None:
+        try:
+            event = api.Event.create(**event_data)
+            logger.info(f"Posted CI Visibility event {event.get('event', {}).get('id')}: {event_data['title']}")
+        except Exception as e:
+            logger.error(f"Failed to post CI Visibility event: {e}")
+    
+    def _event_worker(self) -> None:
+        """Post queued events to Datadog off the caller's thread."""
+        while True:
+            event_data = self._event_queue.get()
+            try:
+                self._post_event(event_data)
+            finally:
+                self._event_queue.task_done()
+    
+    def _drain_events(self) -> None:
+        """Post whatever is still queued at interpreter exit."""
+        while True:
+            try:
+                event_data = self._event_queue.get_nowait()
+            except queue.Empty:
+                return
+            self._post_event(event_data)
+            self._event_queue.task_done()
     
     def track_deployment(
         self,
@@ -60,6 +126,9 @@ class CIVisibilityIntegration:
             return {"error": "CI Visibility disabled"}
         
         try:
+            # Correlation ID returned to the caller and tagged on the event, which is posted asynchronously
+            deployment_id = uuid.uuid4().hex
+            
             # Create deployment event
             event_data = {
                 "title": f"🚀 Deployment: {service} v{version}",
@@ -72,6 +141,7 @@ class CIVisibilityIntegration:
                     f"version:{version}",
                     f"environment:{environment}",
                     "ci_visibility",
+                    f"deployment_id:{deployment_id}",
                 ],
             }
             
@@ -81,11 +151,13 @@ class CIVisibilityIntegration:
                 event_data["tags"].append(f"git.branch:{git_branch}")
             
             if metadata:
-                for key, value in metadata.items():
-                    if isinstance(value, (str, int, float, bool)):
-                        event_data["tags"].append(f"{key}:{value}")
+                event_data["tags"].extend(_metadata_tags(metadata))
             
-            event = api.Event.create(**event_data)
+            try:
+                self._event_queue.put_nowait(event_data)
+            except queue.Full:
+                logger.error(f"Dropped deployment event for {service} v{version}: event queue is full")
+                return {"error": "Deployment event queue is full"}
             
             # Also emit deployment metric
             statsd.increment(
@@ -100,7 +172,7 @@ class CIVisibilityIntegration:
             logger.info(f"Tracked deployment: {service} v{version} to {environment}")
             return {
                 "status": "tracked",
-                "event_id": event.get("event", {}).get("id"),
+                "deployment_id": deployment_id,
                 "service": service,
                 "version": version,
                 "environment": environment,
@@ -132,31 +204,30 @@ class CIVisibilityIntegration:
             tags = [
                 f"test:{test_name}",
                 f"status:{status}",
-                f"service:{service}",
-                "ci_visibility",
+                *_service_tags(service),
             ]
             
             if metadata:
-                for key, value in metadata.items():
-                    if isinstance(value, (str, int, float, bool)):
-                        tags.append(f"{key}:{value}")
-            
-            statsd.increment(
-                "ci.test.count",
-                tags=tags,
-            )
-            
-            statsd.histogram(
-                "ci.test.duration",
-                duration_ms,
-                tags=tags,
-            )
+                tags.extend(_metadata_tags(metadata))
             
-            if status == "fail":
+            # Buffer the test metrics so they go out in a single datagram
+            with statsd:
                 statsd.increment(
-                    "ci.test.failure",
+                    "ci.test.count",
+                    tags=tags,
+                )
+                
+                statsd.histogram(
+                    "ci.test.duration",
+                    duration_ms,
                     tags=tags,
                 )
+                
+                if status == "fail":
+                    statsd.increment(
+                        "ci.test.failure",
+                        tags=tags,
+                    )
             
             logger.info(f"Tracked test result: {test_name} - {status}")
             return {
@@ -186,31 +257,30 @@ class CIVisibilityIntegration:
             tags = [
                 f"build_id:{build_id}",
                 f"status:{status}",
-                f"service:{service}",
-                "ci_visibility",
+                *_service_tags(service),
             ]
             
             if metadata:
-                for key, value in metadata.items():
-                    if isinstance(value, (str, int, float, bool)):
-                        tags.append(f"{key}:{value}")
-            
-            statsd.increment(
-                "ci.build.count",
-                tags=tags,
-            )
+                tags.extend(_metadata_tags(metadata))
             
-            statsd.histogram(
-                "ci.build.duration",
-                duration_ms,
-                tags=tags,
-            )
-            
-            if status == "failure":
+            # Buffer the build metrics so they go out in a single datagram
+            with statsd:
                 statsd.increment(
-                    "ci.build.failure",
+                    "ci.build.count",
+                    tags=tags,
+                )
+                
+                statsd.histogram(
+                    "ci.build.duration",
+                    duration_ms,
                     tags=tags,
                 )
+                
+                if status == "failure":
+                    statsd.increment(
+                        "ci.build.failure",
+                        tags=tags,
+                    )
             
             logger.info(f"Tracked build: {build_id} - {status}")
             return {
@@ -226,13 +296,10 @@ class CIVisibilityIntegration:
 
 
 # Global instance
-_ci_visibility: Optional[CIVisibilityIntegration] = None
+_ci_visibility = LazySingleton(CIVisibilityIntegration)
 
 
 def get_ci_visibility() -> CIVisibilityIntegration:
     """Get or create global CIVisibilityIntegration instance."""
-    global _ci_visibility
-    if _ci_visibility is None:
-        _ci_visibility = CIVisibilityIntegration()
-    return _ci_visibility
+    return _ci_visibility.get()
 
@@ -6,15 +6,21 @@ Tracks errors with context, stack traces, and user impact.
 """
 
 import os
+import atexit
+import itertools
 import logging
+import threading
+import time
 import traceback
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+from collections import Counter, OrderedDict, deque
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 try:
     from datadog import api, statsd
+    from datadog.api.exceptions import ClientError, HTTPError, HttpTimeout
     DD_API_AVAILABLE = True
 except ImportError:
     DD_API_AVAILABLE = False
@@ -27,6 +33,82 @@ except ImportError:
     DD_TRACING_ENABLED = False
     tracer = None
 
+# Error events are queued by track_error and posted by a background flusher. The Events API
+# takes one event per request, so a flush posts up to a batch of events over the client's
+# keep-alive session, retrying failures with exponential backoff. The client wraps transport
+# failures in its own exceptions and, when muted (the default), returns them (and API errors)
+# as an {"errors": [...]} body instead of raising; both are retried.
+ERROR_EVENT_QUEUE_MAX_SIZE = 5000  # oldest events are dropped beyond this
+ERROR_EVENT_FLUSH_INTERVAL_SECONDS = 1.0
+ERROR_EVENT_BATCH_SIZE = 50
+ERROR_EVENT_MAX_ATTEMPTS = 3
+ERROR_EVENT_RETRY_BACKOFF_SECONDS = 0.5
+
+# After this many consecutive failed posts the breaker opens: queued events are dropped (and
+# counted as error.count.dropped) instead of waiting out timeouts, until one probe post is
+# allowed after ERROR_EVENT_BREAKER_OPEN_SECONDS
+ERROR_EVENT_BREAKER_THRESHOLD = 5
+ERROR_EVENT_BREAKER_OPEN_SECONDS = 30.0
+
+# Repeats of an error (same type, message and user) within the window are not sent as events;
+# they are counted and flushed as error.count with a duplicate:true tag
+ERROR_DEDUP_WINDOW_SECONDS = 60
+ERROR_DEDUP_MAX_ENTRIES = 1024
+
+# Stack traces in event text keep the innermost frames and are capped in size
+MAX_STACK_FRAMES = 30
+MAX_STACK_TRACE_CHARS = 8192
+
+# Only these low-cardinality context keys become event tags; the whole context is still in the event text
+_ALLOWED_TAG_KEYS = frozenset({"provider", "model", "severity", "request_type", "service"})
+_MAX_TAG_VALUE_LENGTH = 100
+
+# Error summaries query a window whose end is floored to this bucket, so refreshes within a
+# bucket send identical queries and can share one cached response. Buckets that closed less
+# than ERROR_SUMMARY_SETTLE_SECONDS ago are queried uncached, as late events may still arrive.
+ERROR_SUMMARY_BUCKET_SECONDS = 300
+ERROR_SUMMARY_SETTLE_SECONDS = 30
+
+# Returned by every entry point when tracking is disabled, so that path allocates nothing
+_DISABLED_RESPONSE = {"error": "Error Tracking disabled"}
+
+
+def _format_stack(error: BaseException) -> str:
+    """
+    Format the error's own traceback; unlike format_exc() this works outside its except block.
+    
+    Only the innermost MAX_STACK_FRAMES frames are kept, and the text is cut to its last
+    MAX_STACK_TRACE_CHARS characters so a deep SDK stack cannot bloat the event payload.
+    """
+    stack = "".join(traceback.format_exception(type(error), error, error.__traceback__, limit=-MAX_STACK_FRAMES))
+    if len(stack) > MAX_STACK_TRACE_CHARS:
+        stack = "...(truncated)\n" + stack[-MAX_STACK_TRACE_CHARS:]
+    return stack
+
+
+@lru_cache(maxsize=256)
+def _error_event_tags(error_type: str, severity: str) -> Tuple[str, ...]:
+    """Leading tags of an error event, formatted once per error type and severity."""
+    return ("error", f"error_type:{error_type}", f"severity:{severity}", "llm", "error_tracking")
+
+
+@lru_cache(maxsize=256)
+def _error_count_tags(error_type: str, severity: str, duplicate: bool = False) -> Tuple[str, ...]:
+    """Tags of the error.count metric, formatted once per error type and severity."""
+    tags = (f"error_type:{error_type}", f"severity:{severity}", "service:llm-reliability-control-plane")
+    return tags + ("duplicate:true",) if duplicate else tags
+
+
+def _query_error_events(start: int, end: int, tags: Tuple[str, ...]) -> Dict[str, Any]:
+    response = api.Event.query(start=start, end=end, tags=list(tags), page_size=100)
+    if "errors" in response:
+        # The client returns API errors in the body; raise so they are never cached
+        raise RuntimeError(f"Datadog event query failed: {response['errors']}")
+    return response
+
+
+_query_error_events_cached = lru_cache(maxsize=64)(_query_error_events)
+
 
 class ErrorTrackingIntegration:
     """
@@ -47,6 +129,126 @@ class ErrorTrackingIntegration:
                 self.enabled = False
         else:
             self.enabled = False
+        
+        self._pending: deque = deque(maxlen=ERROR_EVENT_QUEUE_MAX_SIZE)
+        # Only 1 in N warnings is tracked in full; the rest are just counted
+        self._warning_sample_rate = max(1, int(os.getenv("LRCP_WARNING_SAMPLE_N", "10")))
+        self._warning_counter = itertools.count()
+        # (error_type, error_message, user_id) -> [unsent duplicate count, last sent (monotonic), severity], LRU order
+        self._recent_errors: "OrderedDict[Tuple[str, str, Optional[str]], List[Any]]" = OrderedDict()
+        # Unsent duplicate counts of fingerprints evicted from _recent_errors
+        self._evicted_duplicates: List[Tuple[str, int, str]] = []
+        self._recent_errors_lock = threading.Lock()
+        # Circuit breaker state, only touched by the flusher
+        self._breaker_failures = 0
+        self._breaker_opened_at = 0.0
+        if self.enabled:
+            threading.Thread(target=self._flush_loop, name="error-tracking-events", daemon=True).start()
+            atexit.register(self._flush_all)
+    
+    def _is_duplicate(self, fingerprint: Tuple[str, str, Optional[str]], severity: str) -> bool:
+        """Count a repeat of a recently sent error; otherwise record the error as sent now."""
+        now = time.monotonic()
+        with self._recent_errors_lock:
+            entry = self._recent_errors.get(fingerprint)
+            if entry is not None:
+                self._recent_errors.move_to_end(fingerprint)
+                if now - entry[1] < ERROR_DEDUP_WINDOW_SECONDS:
+                    entry[0] += 1
+                    entry[2] = severity
+                    return True
+                entry[1] = now
+                return False
+            self._recent_errors[fingerprint] = [0, now, severity]
+            if len(self._recent_errors) > ERROR_DEDUP_MAX_ENTRIES:
+                (error_type, _, _), (count, _, old_severity) = self._recent_errors.popitem(last=False)
+                if count:
+                    self._evicted_duplicates.append((error_type, count, old_severity))
+            return False
+    
+    def _flush_duplicate_counts(self) -> None:
+        """Emit the duplicate counts accumulated since the last flush."""
+        with self._recent_errors_lock:
+            pending = self._evicted_duplicates
+            self._evicted_duplicates = []
+            for (error_type, _, _), entry in self._recent_errors.items():
+                if entry[0]:
+                    pending.append((error_type, entry[0], entry[2]))
+                    entry[0] = 0
+        if not pending:
+            return
+        try:
+            with statsd:
+                for error_type, count, severity in pending:
+                    statsd.increment(
+                        "error.count",
+                        value=count,
+                        tags=list(_error_count_tags(error_type, severity, duplicate=True))
+                    )
+        except Exception as e:
+            logger.warning(f"Failed to emit duplicate error counts: {e}")
+    
+    def _post_event(self, event_data: Dict[str, Any]) -> None:
+        """Post one event, retrying transport errors with exponential backoff."""
+        if (
+            self._breaker_failures >= ERROR_EVENT_BREAKER_THRESHOLD
+            and time.monotonic() - self._breaker_opened_at < ERROR_EVENT_BREAKER_OPEN_SECONDS
+        ):
+            statsd.increment("error.count.dropped")
+            return
+        for attempt in range(ERROR_EVENT_MAX_ATTEMPTS):
+            try:
+                response = api.Event.create(**event_data)
+            except (ClientError, HttpTimeout, HTTPError) as e:
+                error = e
+            except Exception as e:
+                # Not worth retrying (e.g. an ApiError for a rejected event), but still a failed post
+                logger.error(f"Failed to post error event: {e}")
+                self._record_post_failure()
+                return
+            else:
+                # Only a clean response closes the breaker
+                if not (isinstance(response, dict) and "errors" in response):
+                    self._breaker_failures = 0
+                    return
+                error = response["errors"]
+            if attempt + 1 == ERROR_EVENT_MAX_ATTEMPTS:
+                logger.error(f"Failed to post error event after {ERROR_EVENT_MAX_ATTEMPTS} attempts: {error}")
+                self._record_post_failure()
+                return
+            time.sleep(ERROR_EVENT_RETRY_BACKOFF_SECONDS * (2 ** attempt))
+    
+    def _record_post_failure(self) -> None:
+        """Count a failed post; (re)open the breaker at the threshold, including a failed probe."""
+        self._breaker_failures += 1
+        if self._breaker_failures >= ERROR_EVENT_BREAKER_THRESHOLD:
+            if self._breaker_failures == ERROR_EVENT_BREAKER_THRESHOLD:
+                logger.warning(
+                    f"Datadog Events API unreachable; dropping error events for {ERROR_EVENT_BREAKER_OPEN_SECONDS:.0f}s"
+                )
+            self._breaker_opened_at = time.monotonic()
+    
+    def _flush_events(self, limit: Optional[int] = ERROR_EVENT_BATCH_SIZE) -> None:
+        """Post up to limit queued events (all of them when limit is None)."""
+        sent = 0
+        while limit is None or sent < limit:
+            try:
+                event_data = self._pending.popleft()
+            except IndexError:
+                return
+            self._post_event(event_data)
+            sent += 1
+    
+    def _flush_loop(self) -> None:
+        while True:
+            time.sleep(ERROR_EVENT_FLUSH_INTERVAL_SECONDS)
+            self._flush_events()
+            self._flush_duplicate_counts()
+    
+    def _flush_all(self) -> None:
+        """Post every queued event and duplicate count at interpreter exit."""
+        self._flush_events(None)
+        self._flush_duplicate_counts()
     
     def track_error(
         self,
@@ -64,12 +266,35 @@ class ErrorTrackingIntegration:
         """
         if not self.enabled:
             logger.warning("Error Tracking disabled: Missing API keys")
-            return {"error": "Error Tracking disabled"}
+            return _DISABLED_RESPONSE
         
         try:
             error_type = type(error).__name__
             error_message = str(error)
-            stack_trace = traceback.format_exc()
+            
+            # Mark the request's span as errored, repeats included; only sent errors get the stack
+            span = tracer.current_span() if DD_TRACING_ENABLED and tracer else None
+            if span:
+                span.set_tag("error", True)
+                span.set_tag("error.type", error_type)
+                span.set_tag("error.message", error_message)
+            
+            # Sampled-out warnings are still counted in error.count; only their event is skipped
+            if severity == "warning" and next(self._warning_counter) % self._warning_sample_rate:
+                statsd.increment("error.count", tags=list(_error_count_tags(error_type, severity)))
+                statsd.increment("error.count.sampled", tags=[f"severity:{severity}"])
+                return {"status": "sampled"}
+            
+            # Repeats are only counted, before the (stack-walking) trace formatting and event build
+            if self._is_duplicate((error_type, error_message, user_id), severity):
+                return {
+                    "status": "duplicate",
+                    "error_type": error_type,
+                    "error_message": error_message,
+                }
+            
+            # Only errors that are actually sent pay for the stack formatting
+            stack_trace = _format_stack(error)
             
             # Create error event
             event_data = {
@@ -77,13 +302,7 @@ class ErrorTrackingIntegration:
                 "text": f"{error_message}\n\n**Stack Trace:**\n```\n{stack_trace}\n```\n\n**Context:**\n{self._format_context(context)}",
                 "alert_type": "error",
                 "source_type_name": "Error Tracking",
-                "tags": [
-                    "error",
-                    f"error_type:{error_type}",
-                    f"severity:{severity}",
-                    "llm",
-                    "error_tracking",
-                ],
+                "tags": list(_error_event_tags(error_type, severity)),
             }
             
             if tags:
@@ -93,36 +312,29 @@ class ErrorTrackingIntegration:
                 event_data["tags"].append(f"user_id:{user_id}")
             
             if context:
-                for key, value in context.items():
-                    if isinstance(value, (str, int, float, bool)):
-                        event_data["tags"].append(f"{key}:{value}")
+                event_data["tags"].extend(
+                    f"{key}:{value}"
+                    for key, value in context.items()
+                    if key in _ALLOWED_TAG_KEYS
+                    and isinstance(value, (str, int, float, bool))
+                    and len(str(value)) <= _MAX_TAG_VALUE_LENGTH
+                )
             
-            # Create event
-            event = api.Event.create(**event_data)
+            # Queue the event; the background flusher posts it
+            self._pending.append(event_data)
             
             # Emit error metrics
             statsd.increment(
                 "error.count",
-                tags=[
-                    f"error_type:{error_type}",
-                    f"severity:{severity}",
-                    "service:llm-reliability-control-plane",
-                ]
+                tags=list(_error_count_tags(error_type, severity))
             )
             
-            # Add error to trace if available
-            if DD_TRACING_ENABLED and tracer:
-                span = tracer.current_span()
-                if span:
-                    span.set_tag("error", True)
-                    span.set_tag("error.type", error_type)
-                    span.set_tag("error.message", error_message)
-                    span.set_tag("error.stack", stack_trace)
+            if span:
+                span.set_tag("error.stack", stack_trace)
             
             logger.error(f"Tracked error: {error_type} - {error_message}")
             return {
-                "status": "tracked",
-                "event_id": event.get("event", {}).get("id"),
+                "status": "queued",
                 "error_type": error_type,
                 "error_message": error_message,
             }
@@ -145,6 +357,9 @@ class ErrorTrackingIntegration:
         This demonstrates deep integration: tracking LLM errors
         with provider, model, and prompt context.
         """
+        if not self.enabled:
+            return _DISABLED_RESPONSE
+        
         context = {
             "provider": provider,
             "model": model,
@@ -170,6 +385,9 @@ class ErrorTrackingIntegration:
         cost_calculation: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Track a cost calculation error."""
+        if not self.enabled:
+            return _DISABLED_RESPONSE
+        
         return self.track_error(
             error=error,
             context=cost_calculation or {},
@@ -183,6 +401,9 @@ class ErrorTrackingIntegration:
         quality_calculation: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """Track a quality calculation error."""
+        if not self.enabled:
+            return _DISABLED_RESPONSE
+        
         return self.track_error(
             error=error,
             context=quality_calculation or {},
@@ -191,16 +412,27 @@ class ErrorTrackingIntegration:
         )
     
     def _format_context(self, context: Optional[Dict[str, Any]]) -> str:
-        """Format context dictionary for error message."""
+        """
+        Format context dictionary for error message.
+        
+        Nested dicts are walked iteratively, in order, and their entries are
+        listed under dotted keys (e.g. "cost.tokens").
+        """
         if not context:
             return "No additional context"
         
         lines = []
-        for key, value in context.items():
-            if isinstance(value, (str, int, float, bool)):
-                lines.append(f"- **{key}**: {value}")
-            elif isinstance(value, dict):
-                lines.append(f"- **{key}**: {self._format_context(value)}")
+        stack = [("", iter(context.items()))]
+        while stack:
+            prefix, items = stack[-1]
+            for key, value in items:
+                if isinstance(value, (str, int, float, bool)):
+                    lines.append(f"- **{prefix}{key}**: {value}")
+                elif isinstance(value, dict):
+                    stack.append((f"{prefix}{key}.", iter(value.items())))
+                    break
+            else:
+                stack.pop()
         
         return "\n".join(lines) if lines else "No additional context"
     
@@ -216,32 +448,31 @@ class ErrorTrackingIntegration:
         from Datadog Error Tracking.
         """
         if not self.enabled:
-            return {"error": "Error Tracking disabled"}
+            return _DISABLED_RESPONSE
         
         try:
             # Query errors from Datadog
             # Note: Error Tracking API format may vary
-            end_time = int(datetime.now().timestamp())
+            now = int(time.time())
+            end_time = now - now % ERROR_SUMMARY_BUCKET_SECONDS
             start_time = end_time - (hours * 3600)
+            query_tags = ("error", "llm") + ((f"error_type:{error_type}",) if error_type else ())
             
             # Query error events
-            events = api.Event.query(
-                start=start_time,
-                end=end_time,
-                tags=["error", "llm"] + ([f"error_type:{error_type}"] if error_type else []),
-                page_size=100,
-            )
+            if end_time > now - ERROR_SUMMARY_SETTLE_SECONDS:
+                events = _query_error_events(start_time, end_time, query_tags)
+            else:
+                events = _query_error_events_cached(start_time, end_time, query_tags)
             
             error_count = len(events.get("events", []))
             
-            # Group by error type
-            error_types = {}
-            for event in events.get("events", []):
-                event_type = next(
-                    (tag.split(":")[1] for tag in event.get("tags", []) if tag.startswith("error_type:")),
-                    "unknown"
-                )
-                error_types[event_type] = error_types.get(event_type, 0) + 1
+            # Group by error type. track_error puts error_type second in the tag list, so an early-exit
+            # scan beats building a full tag map per event; slicing keeps values that contain ':'
+            prefix = "error_type:"
+            error_types = dict(Counter(
+                next((tag[len(prefix):] for tag in event.get("tags", ()) if tag.startswith(prefix)), "unknown")
+                for event in events.get("events", [])
+            ))
             
             return {
                 "period_hours": hours,
@@ -8,8 +8,12 @@ Reference: https://docs.datadoghq.com/llm_observability/
 """
 
 import os
+import atexit
 import logging
-from typing import Any, Dict, Optional
+import queue
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
@@ -21,6 +25,90 @@ except ImportError:
     DD_TRACING_ENABLED = False
     tracer = None
 
+try:
+    from datadog import statsd as _statsd
+except ImportError:
+    _statsd = None
+
+# LLM metrics are queued by the request thread and sent by a background worker in buffered
+# batches, so the hot path never does the UDP sends itself; a full queue drops new metrics
+METRIC_QUEUE_MAX_SIZE = 10000
+METRIC_BATCH_SIZE = 128
+
+# (statsd method, metric name, value, tags)
+_metric_queue: "queue.Queue[Tuple[str, str, float, List[str]]]" = queue.Queue(maxsize=METRIC_QUEUE_MAX_SIZE)
+_metric_worker_lock = threading.Lock()
+_metric_worker_started = False
+_dropped_metrics = 0
+
+
+@lru_cache(maxsize=512)
+def _llm_metric_tags(
+    provider: str,
+    model: str,
+    error: bool,
+    extra: Tuple[Tuple[str, Any], ...],
+) -> Tuple[str, ...]:
+    """Tags for an LLM metric, formatted once per distinct provider/model/error/extra combination."""
+    tags = [f"llm_provider:{provider}", f"llm_model:{model}"]
+    tags.extend(f"{k}:{v}" for k, v in extra)
+    if error:
+        tags.append("error:true")
+    return tuple(tags)
+
+
+def _send_metric_batch(statsd, batch: List[Tuple[str, str, float, List[str]]]) -> None:
+    """Send queued metrics inside one statsd buffer, plus a count of any dropped since the last batch."""
+    global _dropped_metrics
+    try:
+        with statsd:
+            for metric_type, name, value, tags in batch:
+                getattr(statsd, metric_type)(name, value, tags=tags)
+            if _dropped_metrics:
+                with _metric_worker_lock:
+                    dropped, _dropped_metrics = _dropped_metrics, 0
+                statsd.count("llm.observability.metrics_dropped", dropped)
+    except Exception as e:
+        logger.warning(f"Failed to emit LLM metrics: {e}")
+
+
+def _metric_worker(statsd) -> None:
+    """Drain the metric queue in batches of up to METRIC_BATCH_SIZE."""
+    while True:
+        batch = [_metric_queue.get()]
+        while len(batch) < METRIC_BATCH_SIZE:
+            try:
+                batch.append(_metric_queue.get_nowait())
+            except queue.Empty:
+                break
+        _send_metric_batch(statsd, batch)
+
+
+def _drain_metric_queue(statsd) -> None:
+    """Send whatever is still queued at interpreter exit."""
+    batch = []
+    while True:
+        try:
+            batch.append(_metric_queue.get_nowait())
+        except queue.Empty:
+            break
+    if batch:
+        _send_metric_batch(statsd, batch)
+
+
+def _start_metric_worker() -> bool:
+    """Start the metric worker once per process; False if the datadog package is missing."""
+    global _metric_worker_started
+    if _statsd is None:
+        logger.warning("Datadog LLM metrics disabled: datadog package not available")
+        return False
+    with _metric_worker_lock:
+        if not _metric_worker_started:
+            threading.Thread(target=_metric_worker, args=(_statsd,), name="llm-metrics", daemon=True).start()
+            atexit.register(_drain_metric_queue, _statsd)
+            _metric_worker_started = True
+    return True
+
 
 class DatadogLLMObservability:
     """
@@ -34,6 +122,16 @@ class DatadogLLMObservability:
         self.enabled = DD_TRACING_ENABLED and tracer is not None
         if not self.enabled:
             logger.warning("Datadog LLM Observability disabled: ddtrace not available")
+        self.metrics_enabled = self.enabled and _start_metric_worker()
+    
+    def _emit(self, metric_type: str, name: str, value: float, tags: List[str]) -> None:
+        """Queue a metric for the background worker; drops it if the queue is full."""
+        global _dropped_metrics
+        try:
+            _metric_queue.put_nowait((metric_type, name, value, tags))
+        except queue.Full:
+            with _metric_worker_lock:
+                _dropped_metrics += 1
     
     @contextmanager
     def llm_generation_span(
@@ -72,31 +170,35 @@ class DatadogLLMObservability:
             resource=f"{provider}.{model}.{request_type}",
         )
         
-        # Standard Datadog LLM Observability tags
+        # Standard Datadog LLM Observability tags, collected and applied in one set_tags call
         # Reference: https://docs.datadoghq.com/llm_observability/attributes/
         
         # Provider and model tags
-        span.set_tag("llm.provider", provider)
-        span.set_tag("llm.request.model", model)
-        span.set_tag("llm.request.type", request_type)
+        start_tags: Dict[str, Any] = {
+            "llm.provider": provider,
+            "llm.request.model": model,
+            "llm.request.type": request_type,
+        }
         
         # Request metadata
         if prompt:
             # Truncate prompt for tagging (keep first 1000 chars)
             truncated_prompt = prompt[:1000] + "..." if len(prompt) > 1000 else prompt
-            span.set_tag("llm.request.input", truncated_prompt)
-            span.set_tag("llm.request.prompt_length", len(prompt))
+            start_tags["llm.request.input"] = truncated_prompt
+            start_tags["llm.request.prompt_length"] = len(prompt)
         
         if user_id:
-            span.set_tag("llm.user.id", user_id)
+            start_tags["llm.user.id"] = user_id
         if session_id:
-            span.set_tag("llm.session.id", session_id)
+            start_tags["llm.session.id"] = session_id
         
         # Additional metadata
         if metadata:
             for key, value in metadata.items():
                 if isinstance(value, (str, int, float, bool)):
-                    span.set_tag(f"llm.{key}", value)
+                    start_tags[f"llm.{key}"] = value
+        
+        span.set_tags(start_tags)
         
         # Create context for tracking tokens and costs
         context = LLMObservabilityContext(span=span)
@@ -104,41 +206,44 @@ class DatadogLLMObservability:
         try:
             yield context
         finally:
-            # Set final tags from context
+            # Set final tags from context; only populated fields are collected, then applied at once
+            final_tags: Dict[str, Any] = {}
             if context.input_tokens > 0:
-                span.set_tag("llm.request.input_tokens", context.input_tokens)
+                final_tags["llm.request.input_tokens"] = context.input_tokens
             if context.output_tokens > 0:
-                span.set_tag("llm.response.output_tokens", context.output_tokens)
+                final_tags["llm.response.output_tokens"] = context.output_tokens
             if context.total_tokens > 0:
-                span.set_tag("llm.request.token_count", context.total_tokens)
+                final_tags["llm.request.token_count"] = context.total_tokens
             
             if context.cost_usd > 0:
-                span.set_tag("llm.request.cost", context.cost_usd)
+                final_tags["llm.request.cost"] = context.cost_usd
             
             if context.model:
-                span.set_tag("llm.response.model", context.model)
+                final_tags["llm.response.model"] = context.model
             
             if context.error:
-                span.set_tag("error", True)
-                span.set_tag("error.type", context.error_type or "LLMError")
-                span.set_tag("error.message", str(context.error))
+                final_tags["error"] = True
+                final_tags["error.type"] = context.error_type or "LLMError"
+                final_tags["error.message"] = str(context.error)
             
             # Set latency (handled by span timing, but we can also set it explicitly)
             if context.latency_ms:
-                span.set_tag("llm.request.latency", context.latency_ms)
+                final_tags["llm.request.latency"] = context.latency_ms
             
             # EXTENSION: Add semantic similarity and quality metrics (extends native LLM Observability)
             if context.semantic_similarity_score is not None:
-                span.set_tag("llm.quality.semantic_similarity", context.semantic_similarity_score)
-                span.set_tag("llm.quality.good", context.semantic_similarity_score > 0.7)
-                span.set_tag("llm.quality.degraded", context.semantic_similarity_score < 0.4)
+                final_tags["llm.quality.semantic_similarity"] = context.semantic_similarity_score
+                final_tags["llm.quality.good"] = context.semantic_similarity_score > 0.7
+                final_tags["llm.quality.degraded"] = context.semantic_similarity_score < 0.4
             
             if context.ungrounded_flag is not None:
-                span.set_tag("llm.quality.ungrounded", context.ungrounded_flag)
+                final_tags["llm.quality.ungrounded"] = context.ungrounded_flag
             
             if context.response_length:
-                span.set_tag("llm.response.length", context.response_length)
+                final_tags["llm.response.length"] = context.response_length
             
+            if final_tags:
+                span.set_tags(final_tags)
             span.finish()
     
     def track_llm_metrics(
@@ -157,32 +262,23 @@ class DatadogLLMObservability:
         
         This emits metrics using Datadog's standard LLM metric conventions.
         """
-        if not self.enabled:
+        if not self.metrics_enabled:
             return
         
         try:
-            from datadog import statsd
-            
-            base_tags = [
-                f"llm_provider:{provider}",
-                f"llm_model:{model}",
-            ]
-            
-            if tags:
-                base_tags.extend([f"{k}:{v}" for k, v in tags.items()])
-            
-            if error:
-                base_tags.append("error:true")
+            # statsd appends its constant tags with list +, so hand it a list copy of the cached tuple
+            base_tags = list(_llm_metric_tags(provider, model, error, tuple(tags.items()) if tags else ()))
             
             # LLM-specific metrics (these will appear in Datadog LLM Observability)
-            statsd.histogram("llm.request.duration", latency_ms, tags=base_tags)
-            statsd.count("llm.request.tokens.input", input_tokens, tags=base_tags)
-            statsd.count("llm.request.tokens.output", output_tokens, tags=base_tags)
-            statsd.count("llm.request.tokens.total", input_tokens + output_tokens, tags=base_tags)
-            statsd.histogram("llm.request.cost", cost_usd, tags=base_tags)
+            emit = self._emit
+            emit("histogram", "llm.request.duration", latency_ms, base_tags)
+            emit("count", "llm.request.tokens.input", input_tokens, base_tags)
+            emit("count", "llm.request.tokens.output", output_tokens, base_tags)
+            emit("count", "llm.request.tokens.total", input_tokens + output_tokens, base_tags)
+            emit("histogram", "llm.request.cost", cost_usd, base_tags)
             
             if error:
-                statsd.increment("llm.request.error", tags=base_tags)
+                emit("increment", "llm.request.error", 1, base_tags)
             
         except Exception as e:
             logger.warning(f"Failed to emit LLM metrics: {e}")
@@ -199,25 +295,18 @@ class DatadogLLMObservability:
         EXTENSION: Track quality metrics as custom metrics.
         This extends Datadog's native LLM Observability with semantic similarity analysis.
         """
-        if not self.enabled:
+        if not self.metrics_enabled:
             return
         
         try:
-            from datadog import statsd
-            
-            base_tags = [
-                f"llm_provider:{provider}",
-                f"llm_model:{model}",
-            ]
-            
-            if tags:
-                base_tags.extend([f"{k}:{v}" for k, v in tags.items()])
+            base_tags = list(_llm_metric_tags(provider, model, False, tuple(tags.items()) if tags else ()))
             
             # Quality metrics (extends native LLM Observability)
-            statsd.gauge("llm.quality.semantic_similarity", semantic_similarity_score, tags=base_tags)
-            statsd.gauge("llm.quality.ungrounded", float(ungrounded_flag), tags=base_tags)
-            statsd.gauge("llm.quality.good", float(semantic_similarity_score > 0.7), tags=base_tags)
-            statsd.gauge("llm.quality.degraded", float(semantic_similarity_score < 0.4), tags=base_tags)
+            emit = self._emit
+            emit("gauge", "llm.quality.semantic_similarity", semantic_similarity_score, base_tags)
+            emit("gauge", "llm.quality.ungrounded", float(ungrounded_flag), base_tags)
+            emit("gauge", "llm.quality.good", float(semantic_similarity_score > 0.7), base_tags)
+            emit("gauge", "llm.quality.degraded", float(semantic_similarity_score < 0.4), base_tags)
             
         except Exception as e:
             logger.warning(f"Failed to emit quality metrics: {e}")
@@ -227,8 +316,26 @@ class LLMObservabilityContext:
     """
     Context object for tracking LLM request metadata during generation.
     Extended with semantic similarity and quality metrics.
+    
+    The setters only record values; llm_generation_span writes them to the span once, at finish.
     """
     
+    # One context per LLM call: slots drop the per-instance __dict__
+    __slots__ = (
+        "span",
+        "input_tokens",
+        "output_tokens",
+        "total_tokens",
+        "cost_usd",
+        "model",
+        "latency_ms",
+        "error",
+        "error_type",
+        "semantic_similarity_score",
+        "ungrounded_flag",
+        "response_length",
+    )
+    
     def __init__(self, span=None):
         self.span = span
         self.input_tokens = 0
@@ -249,32 +356,19 @@ class LLMObservabilityContext:
         self.input_tokens = input_tokens
         self.output_tokens = output_tokens
         self.total_tokens = input_tokens + output_tokens
-        
-        if self.span:
-            self.span.set_tag("llm.request.input_tokens", input_tokens)
-            self.span.set_tag("llm.response.output_tokens", output_tokens)
-            self.span.set_tag("llm.request.token_count", self.total_tokens)
     
     def set_cost(self, cost_usd: float):
         """Set cost in USD."""
         self.cost_usd = cost_usd
-        if self.span:
-            self.span.set_tag("llm.request.cost", cost_usd)
     
     def set_model(self, model: str):
         """Set response model name."""
         self.model = model
-        if self.span:
-            self.span.set_tag("llm.response.model", model)
     
     def set_error(self, error: Exception):
         """Set error information."""
         self.error = error
         self.error_type = type(error).__name__
-        if self.span:
-            self.span.set_tag("error", True)
-            self.span.set_tag("error.type", self.error_type)
-            self.span.set_tag("error.message", str(error))
     
     def set_quality_metrics(
         self,
@@ -290,14 +384,6 @@ class LLMObservabilityContext:
         self.ungrounded_flag = ungrounded_flag
         if response_length is not None:
             self.response_length = response_length
-        
-        if self.span:
-            self.span.set_tag("llm.quality.semantic_similarity", semantic_similarity_score)
-            self.span.set_tag("llm.quality.good", semantic_similarity_score > 0.7)
-            self.span.set_tag("llm.quality.degraded", semantic_similarity_score < 0.4)
-            self.span.set_tag("llm.quality.ungrounded", ungrounded_flag)
-            if response_length is not None:
-                self.span.set_tag("llm.response.length", response_length)
 
 
 # Global instance
@@ -6,9 +6,18 @@ Programmatically manages log pipelines.
 """
 
 import os
+import hashlib
+import json
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from typing import Dict, List, Any, Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Any, Optional, Tuple
+from urllib3.util.retry import Retry
+
+from .rate_limit import TokenBucket
+from .singleton import LazySingleton
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +28,147 @@ except ImportError:
     DD_API_AVAILABLE = False
     logger.warning("Datadog API not available. Install: pip install datadog")
 
+# Responses are parsed straight from the body bytes; orjson is used when installed
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Pipeline API calls share one keep-alive session. Rate limits and 5xx responses are retried
+# with backoff (honouring Retry-After) for GETs; POSTs are not retried on a response, so a
+# create is never sent twice.
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 10
+HTTP_RETRY = Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+
+# Pipeline configs change on human timescales, so list responses are cached for this long.
+# Creating a pipeline through this integration drops the cached list.
+LIST_PIPELINES_TTL_SECONDS = 30.0
+
+# Pipeline API calls that reach Datadog (cache hits do not) are throttled client-side to stay
+# under the org's logs pipeline rate limit
+PIPELINES_API_REQUESTS_PER_MINUTE = 30
+_pipelines_api_bucket = TokenBucket(PIPELINES_API_REQUESTS_PER_MINUTE)
+
+# Pipelines created here carry this prefix and their config hash as description
+PIPELINE_CONFIG_HASH_PREFIX = "lrcp-config-sha256:"
+
+
+# Pipeline configs are static, so they are built once at import. They are never mutated:
+# requests serializes them per POST and the create_* fallbacks only return them.
+_LLM_REQUEST_PIPELINE_CONFIG: Dict[str, Any] = {
+    "name": "LLM Request Pipeline",
+    "filter": {
+        "query": "service:llm-reliability-control-plane source:python"
+    },
+    "processors": [
+        {
+            "type": "grok_parser",
+            "name": "Parse LLM Request Logs",
+            "is_enabled": True,
+            "samples": [],
+            "grok": {
+                "support_rules": "",
+                "match_rules": "rule LLM_REQUEST %{DATA:timestamp} %{WORD:level} %{DATA:message}"
+            },
+            "source": "message"
+        },
+        {
+            "type": "attribute_remapper",
+            "name": "Remap LLM Attributes",
+            "is_enabled": True,
+            "sources": [
+                {
+                    "source": "llm.provider",
+                    "source_type": "attribute"
+                },
+                {
+                    "source": "llm.model",
+                    "source_type": "attribute"
+                }
+            ],
+            "target": "llm.provider",
+            "target_type": "tag",
+            "preserve_source": False,
+            "override_on_conflict": False
+        },
+        {
+            "type": "url_parser",
+            "name": "Parse Request URLs",
+            "is_enabled": True,
+            "sources": ["http.url"],
+            "target": "http.url_details",
+            "normalize_ending_slashes": True
+        }
+    ],
+    "is_enabled": True
+}
+
+_COST_PIPELINE_CONFIG: Dict[str, Any] = {
+    "name": "LLM Cost Pipeline",
+    "filter": {
+        "query": "service:llm-reliability-control-plane cost"
+    },
+    "processors": [
+        {
+            "type": "grok_parser",
+            "name": "Parse Cost Logs",
+            "is_enabled": True,
+            "grok": {
+                "match_rules": "rule COST_LOG %{NUMBER:cost_usd:float} %{WORD:currency}"
+            },
+            "source": "message"
+        },
+        {
+            "type": "arithmetic_processor",
+            "name": "Calculate Cost Metrics",
+            "is_enabled": True,
+            "expression": "cost_usd * 100",
+            "target": "cost_cents",
+            "is_replace_missing": False
+        }
+    ],
+    "is_enabled": True
+}
+
+_SECURITY_PIPELINE_CONFIG: Dict[str, Any] = {
+    "name": "LLM Security Redaction Pipeline",
+    "filter": {
+        "query": "service:llm-reliability-control-plane prompt"
+    },
+    "processors": [
+        {
+            "type": "string_builder_processor",
+            "name": "Redact Sensitive Prompts",
+            "is_enabled": True,
+            "template": "{{#if prompt}}[REDACTED: Prompt contains sensitive data]{{else}}{{message}}{{/if}}",
+            "target": "message",
+            "is_replace_missing": False
+        },
+        {
+            "type": "category_processor",
+            "name": "Categorize Security Events",
+            "is_enabled": True,
+            "target": "security.category",
+            "categories": [
+                {
+                    "filter": {
+                        "query": "injection"
+                    },
+                    "name": "prompt_injection"
+                },
+                {
+                    "filter": {
+                        "query": "abuse"
+                    },
+                    "name": "token_abuse"
+                }
+            ]
+        }
+    ],
+    "is_enabled": True
+}
+
 
 class LogPipelinesIntegration:
     """
@@ -28,6 +178,11 @@ class LogPipelinesIntegration:
     """
     
     def __init__(self):
+        # url -> (expires at (monotonic), parsed response)
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+        # sha256 of a canonical pipeline config -> API response of its create, so repeat creates
+        # within the process are not sent again
+        self._create_cache: Dict[str, Dict[str, Any]] = {}
         if DD_API_AVAILABLE:
             self.api_key = os.getenv("DD_API_KEY") or os.getenv("LRCP_DATADOG_API_KEY")
             self.app_key = os.getenv("DD_APP_KEY")
@@ -37,11 +192,52 @@ class LogPipelinesIntegration:
                 api._application_key = self.app_key
                 self.enabled = True
                 self.base_url = f"https://api.{self.site}"
+                self._session = requests.Session()
+                self._session.headers.update({
+                    "DD-API-KEY": self.api_key,
+                    "DD-APPLICATION-KEY": self.app_key,
+                    "Content-Type": "application/json",
+                })
+                self._session.mount("https://", HTTPAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    max_retries=HTTP_RETRY,
+                ))
             else:
                 self.enabled = False
         else:
             self.enabled = False
     
+    def _create_pipeline(self, pipeline_config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a pipeline config unless it already exists.
+        
+        The config's hash is stored in the created pipeline's description, so a pipeline with the
+        same name and hash in the (cached) pipeline list is returned instead of creating a duplicate,
+        even across restarts. Within the process, repeat creates return the earlier response.
+        """
+        key = hashlib.sha256(
+            json.dumps(pipeline_config, sort_keys=True, separators=(",", ":")).encode()
+        ).hexdigest()
+        created = self._create_cache.get(key)
+        if created is not None:
+            return created
+        
+        description = f"{PIPELINE_CONFIG_HASH_PREFIX}{key}"
+        for pipeline in self.list_pipelines():
+            if pipeline.get("name") == pipeline_config["name"] and pipeline.get("description") == description:
+                self._create_cache[key] = pipeline
+                return pipeline
+        
+        url = f"{self.base_url}/api/v1/logs/config/pipelines"
+        _pipelines_api_bucket.acquire()
+        response = self._session.post(url, json={**pipeline_config, "description": description})
+        response.raise_for_status()
+        created = _json_loads(response.content)
+        self._create_cache[key] = created
+        self.invalidate(url)
+        return created
+    
     def create_llm_request_pipeline(self) -> Dict[str, Any]:
         """
         Create a log pipeline for processing LLM request logs.
@@ -53,67 +249,12 @@ class LogPipelinesIntegration:
             return {"error": "Log Pipelines integration disabled"}
         
         try:
-            pipeline_config = {
-                "name": "LLM Request Pipeline",
-                "filter": {
-                    "query": "service:llm-reliability-control-plane source:python"
-                },
-                "processors": [
-                    {
-                        "type": "grok_parser",
-                        "name": "Parse LLM Request Logs",
-                        "is_enabled": True,
-                        "samples": [],
-                        "grok": {
-                            "support_rules": "",
-                            "match_rules": "rule LLM_REQUEST %{DATA:timestamp} %{WORD:level} %{DATA:message}"
-                        },
-                        "source": "message"
-                    },
-                    {
-                        "type": "attribute_remapper",
-                        "name": "Remap LLM Attributes",
-                        "is_enabled": True,
-                        "sources": [
-                            {
-                                "source": "llm.provider",
-                                "source_type": "attribute"
-                            },
-                            {
-                                "source": "llm.model",
-                                "source_type": "attribute"
-                            }
-                        ],
-                        "target": "llm.provider",
-                        "target_type": "tag",
-                        "preserve_source": False,
-                        "override_on_conflict": False
-                    },
-                    {
-                        "type": "url_parser",
-                        "name": "Parse Request URLs",
-                        "is_enabled": True,
-                        "sources": ["http.url"],
-                        "target": "http.url_details",
-                        "normalize_ending_slashes": True
-                    }
-                ],
-                "is_enabled": True
-            }
+            pipeline_config = _LLM_REQUEST_PIPELINE_CONFIG
             
             # Create pipeline via API
-            url = f"{self.base_url}/api/v1/logs/config/pipelines"
-            headers = {
-                "DD-API-KEY": self.api_key,
-                "DD-APPLICATION-KEY": self.app_key,
-                "Content-Type": "application/json",
-            }
-            
-            response = requests.post(url, json=pipeline_config, headers=headers)
-            response.raise_for_status()
-            
+            result = self._create_pipeline(pipeline_config)
             logger.info("Created LLM request log pipeline")
-            return response.json()
+            return result
             
         except Exception as e:
             logger.error(f"Failed to create log pipeline: {e}")
@@ -129,45 +270,11 @@ class LogPipelinesIntegration:
             return {"error": "Log Pipelines integration disabled"}
         
         try:
-            pipeline_config = {
-                "name": "LLM Cost Pipeline",
-                "filter": {
-                    "query": "service:llm-reliability-control-plane cost"
-                },
-                "processors": [
-                    {
-                        "type": "grok_parser",
-                        "name": "Parse Cost Logs",
-                        "is_enabled": True,
-                        "grok": {
-                            "match_rules": "rule COST_LOG %{NUMBER:cost_usd:float} %{WORD:currency}"
-                        },
-                        "source": "message"
-                    },
-                    {
-                        "type": "arithmetic_processor",
-                        "name": "Calculate Cost Metrics",
-                        "is_enabled": True,
-                        "expression": "cost_usd * 100",
-                        "target": "cost_cents",
-                        "is_replace_missing": False
-                    }
-                ],
-                "is_enabled": True
-            }
-            
-            url = f"{self.base_url}/api/v1/logs/config/pipelines"
-            headers = {
-                "DD-API-KEY": self.api_key,
-                "DD-APPLICATION-KEY": self.app_key,
-                "Content-Type": "application/json",
-            }
-            
-            response = requests.post(url, json=pipeline_config, headers=headers)
-            response.raise_for_status()
+            pipeline_config = _COST_PIPELINE_CONFIG
             
+            result = self._create_pipeline(pipeline_config)
             logger.info("Created cost log pipeline")
-            return response.json()
+            return result
             
         except Exception as e:
             logger.error(f"Failed to create cost pipeline: {e}")
@@ -187,56 +294,11 @@ class LogPipelinesIntegration:
             return {"error": "Log Pipelines integration disabled"}
         
         try:
-            pipeline_config = {
-                "name": "LLM Security Redaction Pipeline",
-                "filter": {
-                    "query": "service:llm-reliability-control-plane prompt"
-                },
-                "processors": [
-                    {
-                        "type": "string_builder_processor",
-                        "name": "Redact Sensitive Prompts",
-                        "is_enabled": True,
-                        "template": "{{#if prompt}}[REDACTED: Prompt contains sensitive data]{{else}}{{message}}{{/if}}",
-                        "target": "message",
-                        "is_replace_missing": False
-                    },
-                    {
-                        "type": "category_processor",
-                        "name": "Categorize Security Events",
-                        "is_enabled": True,
-                        "target": "security.category",
-                        "categories": [
-                            {
-                                "filter": {
-                                    "query": "injection"
-                                },
-                                "name": "prompt_injection"
-                            },
-                            {
-                                "filter": {
-                                    "query": "abuse"
-                                },
-                                "name": "token_abuse"
-                            }
-                        ]
-                    }
-                ],
-                "is_enabled": True
-            }
-            
-            url = f"{self.base_url}/api/v1/logs/config/pipelines"
-            headers = {
-                "DD-API-KEY": self.api_key,
-                "DD-APPLICATION-KEY": self.app_key,
-                "Content-Type": "application/json",
-            }
-            
-            response = requests.post(url, json=pipeline_config, headers=headers)
-            response.raise_for_status()
+            pipeline_config = _SECURITY_PIPELINE_CONFIG
             
+            result = self._create_pipeline(pipeline_config)
             logger.info("Created security redaction pipeline")
-            return response.json()
+            return result
             
         except Exception as e:
             logger.error(f"Failed to create security pipeline: {e}")
@@ -246,36 +308,68 @@ class LogPipelinesIntegration:
                 "error": str(e)
             }
     
-    def list_pipelines(self) -> List[Dict[str, Any]]:
-        """List all log pipelines."""
+    def create_all_pipelines(self) -> List[Dict[str, Any]]:
+        """
+        Create the LLM request, cost and security pipelines concurrently.
+        
+        The creates are independent I/O-bound POSTs over the shared session's connection pool,
+        so this takes about as long as the slowest one. Results are in that order.
+        """
+        creates = (
+            self.create_llm_request_pipeline,
+            self.create_cost_log_pipeline,
+            self.create_security_redaction_pipeline,
+        )
+        with ThreadPoolExecutor(max_workers=len(creates)) as executor:
+            futures = [executor.submit(create) for create in creates]
+            return [future.result() for future in futures]
+    
+    def invalidate(self, url: Optional[str] = None) -> None:
+        """Drop the cached response for url, or every cached response when url is None."""
+        if url is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(url, None)
+    
+    def list_pipelines(self, cache_fallback: bool = True) -> List[Dict[str, Any]]:
+        """
+        List all log pipelines.
+        
+        Responses are cached for LIST_PIPELINES_TTL_SECONDS. With cache_fallback, a failed
+        request returns the last (stale) cached list instead of an empty one.
+        """
         if not self.enabled:
             return []
         
+        url = f"{self.base_url}/api/v1/logs/config/pipelines"
+        cached = self._cache.get(url)
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached[1]
+        
         try:
-            url = f"{self.base_url}/api/v1/logs/config/pipelines"
-            headers = {
-                "DD-API-KEY": self.api_key,
-                "DD-APPLICATION-KEY": self.app_key,
-            }
-            
-            response = requests.get(url, headers=headers)
+            _pipelines_api_bucket.acquire()
+            response = self._session.get(url)
             response.raise_for_status()
             
-            return response.json().get("pipelines", [])
+            # The v1 API returns a bare array of pipelines
+            data = _json_loads(response.content)
+            pipelines = data if isinstance(data, list) else data.get("pipelines", [])
+            self._cache[url] = (time.monotonic() + LIST_PIPELINES_TTL_SECONDS, pipelines)
+            return pipelines
             
         except Exception as e:
+            if cache_fallback and cached is not None:
+                logger.warning(f"Failed to list pipelines, returning cached list: {e}")
+                return cached[1]
             logger.error(f"Failed to list pipelines: {e}")
             return []
 
 
 # Global instance
-_log_pipelines: Optional[LogPipelinesIntegration] = None
+_log_pipelines = LazySingleton(LogPipelinesIntegration)
 
 
 def get_log_pipelines() -> LogPipelinesIntegration:
     """Get or create global LogPipelinesIntegration instance."""
-    global _log_pipelines
-    if _log_pipelines is None:
-        _log_pipelines = LogPipelinesIntegration()
-    return _log_pipelines
+    return _log_pipelines.get()
 
@@ -7,9 +7,13 @@ Creates notebooks programmatically for root cause analysis, cost optimization, e
 
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 
+from .rate_limit import TokenBucket
+from .singleton import LazySingleton
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -19,6 +23,208 @@ except ImportError:
     DD_API_AVAILABLE = False
     logger.warning("Datadog API not available. Install: pip install datadog")
 
+# Notebook creates are I/O-bound API calls, so a batch is sent on this many threads
+NOTEBOOK_CREATE_WORKERS = 4
+
+# Notebook API calls are throttled client-side to stay under the org's notebooks rate limit
+NOTEBOOKS_API_REQUESTS_PER_MINUTE = 30
+_notebooks_api_bucket = TokenBucket(NOTEBOOKS_API_REQUESTS_PER_MINUTE)
+
+
+# Header and analysis markdown of each notebook; only these depend on the request and are
+# filled in with str.format
+_ROOT_CAUSE_HEADER_TMPL = (
+    "# 🔍 Root Cause Analysis\n\n**Incident:** {incident_title}\n**Time Range:** {start} to {end}\n\n"
+    "## Analysis Overview\n\nThis notebook analyzes the root cause of the incident by examining:\n"
+    "- Metrics trends\n- Trace analysis\n- Log patterns\n- Service dependencies"
+)
+_COST_HEADER_TMPL = (
+    "# 💰 Cost Optimization Analysis\n\n**Period:** {start} to {end}\n\n"
+    "## Overview\n\nThis notebook analyzes cost optimization opportunities for the LLM application."
+)
+_ANOMALY_HEADER_TMPL = (
+    "# 🚨 Anomaly Analysis\n\n**Anomaly ID:** {anomaly_id}\n**Metric:** {metric_name}\n\n"
+    "## Attribution\n\n**Primary Cause:** {primary_cause}\n**Confidence:** {confidence:.1f}%\n\n"
+    "**Contributing Factors:**\n{factors}"
+)
+_ANOMALY_ANALYSIS_TMPL = (
+    "## 📊 Analysis\n\n**Baseline Value:** {baseline}\n**Anomalous Value:** {anomalous}\n"
+    "**Change:** {change:.1f}%\n\n**Affected Resources:**\n- Endpoints: {endpoints}\n- Models: {models}"
+)
+
+
+def _markdown_cell(text: str) -> Dict[str, Any]:
+    return {"type": "markdown", "attributes": {"definition": {"text": text}}}
+
+
+# Notebook cells that do not depend on the request are built once at import and shared by
+# every notebook; the client only serializes them.
+_ROOT_CAUSE_STATIC_CELLS: List[Dict[str, Any]] = [
+    {
+        "type": "timeseries",
+        "attributes": {
+            "definition": {
+                "requests": [
+                    {
+                        "q": "avg:llm.request.latency_ms{service:llm-reliability-control-plane}",
+                        "display_type": "line",
+                        "style": {
+                            "palette": "dog_classic",
+                            "line_type": "solid",
+                            "line_width": "normal"
+                        }
+                    }
+                ],
+                "yaxis": {
+                    "label": "Latency (ms)",
+                    "scale": "linear"
+                },
+                "show_legend": True,
+                "legend_size": "0"
+            }
+        }
+    },
+    {
+        "type": "timeseries",
+        "attributes": {
+            "definition": {
+                "requests": [
+                    {
+                        "q": "sum:llm.error.count{service:llm-reliability-control-plane}",
+                        "display_type": "bars",
+                        "style": {
+                            "palette": "dog_classic",
+                            "line_type": "solid",
+                            "line_width": "normal"
+                        }
+                    }
+                ],
+                "yaxis": {
+                    "label": "Error Count",
+                    "scale": "linear"
+                }
+            }
+        }
+    },
+    {
+        "type": "timeseries",
+        "attributes": {
+            "definition": {
+                "requests": [
+                    {
+                        "q": "sum:llm.cost.usd{service:llm-reliability-control-plane}",
+                        "display_type": "line",
+                        "style": {
+                            "palette": "green",
+                            "line_type": "solid",
+                            "line_width": "normal"
+                        }
+                    }
+                ],
+                "yaxis": {
+                    "label": "Cost (USD)",
+                    "scale": "linear"
+                }
+            }
+        }
+    },
+    {
+        "type": "markdown",
+        "attributes": {
+            "definition": {
+                "text": "## 🔎 Findings\n\n### Key Observations:\n1. **Latency Spike:** Check the latency timeseries above\n2. **Error Patterns:** Review error count trends\n3. **Cost Impact:** Analyze cost during incident period\n\n### Next Steps:\n1. Review APM traces for slow spans\n2. Check logs for error patterns\n3. Analyze service dependencies"
+            }
+        }
+    },
+    {
+        "type": "query_value",
+        "attributes": {
+            "definition": {
+                "requests": [
+                    {
+                        "q": "avg:llm.health_score{service:llm-reliability-control-plane}",
+                        "aggregator": "avg"
+                    }
+                ],
+                "autoscale": True,
+                "precision": 2,
+                "text_align": "center",
+                "title": "Health Score During Incident"
+            }
+        }
+    }
+]
+
+_COST_STATIC_CELLS: List[Dict[str, Any]] = [
+    {
+        "type": "timeseries",
+        "attributes": {
+            "definition": {
+                "requests": [
+                    {
+                        "q": "sum:llm.cost.usd{service:llm-reliability-control-plane} by {endpoint}",
+                        "display_type": "bars",
+                        "style": {
+                            "palette": "dog_classic"
+                        }
+                    }
+                ],
+                "yaxis": {
+                    "label": "Cost (USD)",
+                    "scale": "linear"
+                },
+                "title": "Cost by Endpoint"
+            }
+        }
+    },
+    {
+        "type": "timeseries",
+        "attributes": {
+            "definition": {
+                "requests": [
+                    {
+                        "q": "sum:llm.tokens.input{service:llm-reliability-control-plane}",
+                        "display_type": "line"
+                    },
+                    {
+                        "q": "sum:llm.tokens.output{service:llm-reliability-control-plane}",
+                        "display_type": "line"
+                    }
+                ],
+                "yaxis": {
+                    "label": "Tokens",
+                    "scale": "linear"
+                },
+                "title": "Token Usage Trends"
+            }
+        }
+    },
+    {
+        "type": "query_value",
+        "attributes": {
+            "definition": {
+                "requests": [
+                    {
+                        "q": "sum:llm.optimization.savings.total{service:llm-reliability-control-plane}",
+                        "aggregator": "sum"
+                    }
+                ],
+                "title": "Total Savings from Optimizations",
+                "precision": 2,
+                "text_align": "center"
+            }
+        }
+    },
+    {
+        "type": "markdown",
+        "attributes": {
+            "definition": {
+                "text": "## 💡 Recommendations\n\n1. **High-Cost Endpoints:** Identify endpoints with highest cost\n2. **Token Optimization:** Review token usage patterns\n3. **Model Selection:** Consider model downgrades for non-critical requests\n4. **Caching:** Implement response caching for repeated queries"
+            }
+        }
+    }
+]
+
 
 class NotebooksIntegration:
     """
@@ -66,107 +272,12 @@ class NotebooksIntegration:
                     "attributes": {
                         "name": f"Root Cause Analysis: {incident_title or 'Incident'}" if incident_id else "LLM Incident Root Cause Analysis",
                         "cells": [
-                            {
-                                "type": "markdown",
-                                "attributes": {
-                                    "definition": {
-                                        "text": f"# 🔍 Root Cause Analysis\n\n**Incident:** {incident_title or 'Unknown'}\n**Time Range:** {start_time.isoformat()} to {end_time.isoformat()}\n\n## Analysis Overview\n\nThis notebook analyzes the root cause of the incident by examining:\n- Metrics trends\n- Trace analysis\n- Log patterns\n- Service dependencies"
-                                    }
-                                }
-                            },
-                            {
-                                "type": "timeseries",
-                                "attributes": {
-                                    "definition": {
-                                        "requests": [
-                                            {
-                                                "q": "avg:llm.request.latency_ms{service:llm-reliability-control-plane}",
-                                                "display_type": "line",
-                                                "style": {
-                                                    "palette": "dog_classic",
-                                                    "line_type": "solid",
-                                                    "line_width": "normal"
-                                                }
-                                            }
-                                        ],
-                                        "yaxis": {
-                                            "label": "Latency (ms)",
-                                            "scale": "linear"
-                                        },
-                                        "show_legend": True,
-                                        "legend_size": "0"
-                                    }
-                                }
-                            },
-                            {
-                                "type": "timeseries",
-                                "attributes": {
-                                    "definition": {
-                                        "requests": [
-                                            {
-                                                "q": "sum:llm.error.count{service:llm-reliability-control-plane}",
-                                                "display_type": "bars",
-                                                "style": {
-                                                    "palette": "dog_classic",
-                                                    "line_type": "solid",
-                                                    "line_width": "normal"
-                                                }
-                                            }
-                                        ],
-                                        "yaxis": {
-                                            "label": "Error Count",
-                                            "scale": "linear"
-                                        }
-                                    }
-                                }
-                            },
-                            {
-                                "type": "timeseries",
-                                "attributes": {
-                                    "definition": {
-                                        "requests": [
-                                            {
-                                                "q": "sum:llm.cost.usd{service:llm-reliability-control-plane}",
-                                                "display_type": "line",
-                                                "style": {
-                                                    "palette": "green",
-                                                    "line_type": "solid",
-                                                    "line_width": "normal"
-                                                }
-                                            }
-                                        ],
-                                        "yaxis": {
-                                            "label": "Cost (USD)",
-                                            "scale": "linear"
-                                        }
-                                    }
-                                }
-                            },
-                            {
-                                "type": "markdown",
-                                "attributes": {
-                                    "definition": {
-                                        "text": "## 🔎 Findings\n\n### Key Observations:\n1. **Latency Spike:** Check the latency timeseries above\n2. **Error Patterns:** Review error count trends\n3. **Cost Impact:** Analyze cost during incident period\n\n### Next Steps:\n1. Review APM traces for slow spans\n2. Check logs for error patterns\n3. Analyze service dependencies"
-                                    }
-                                }
-                            },
-                            {
-                                "type": "query_value",
-                                "attributes": {
-                                    "definition": {
-                                        "requests": [
-                                            {
-                                                "q": "avg:llm.health_score{service:llm-reliability-control-plane}",
-                                                "aggregator": "avg"
-                                            }
-                                        ],
-                                        "autoscale": True,
-                                        "precision": 2,
-                                        "text_align": "center",
-                                        "title": "Health Score During Incident"
-                                    }
-                                }
-                            }
+                            _markdown_cell(_ROOT_CAUSE_HEADER_TMPL.format(
+                                incident_title=incident_title or 'Unknown',
+                                start=start_time.isoformat(),
+                                end=end_time.isoformat(),
+                            )),
+                            *_ROOT_CAUSE_STATIC_CELLS
                         ]
                     }
                 }
@@ -175,6 +286,7 @@ class NotebooksIntegration:
             # Create notebook via API
             # Note: Datadog Notebooks API may require different format
             # This is a conceptual implementation
+            _notebooks_api_bucket.acquire()
             response = api.Notebooks.create(**notebook_data)
             
             logger.info(f"Created root cause analysis notebook for incident: {incident_id}")
@@ -207,86 +319,14 @@ class NotebooksIntegration:
                     "attributes": {
                         "name": f"Cost Optimization Analysis: {recommendation_id or 'General'}",
                         "cells": [
-                            {
-                                "type": "markdown",
-                                "attributes": {
-                                    "definition": {
-                                        "text": f"# 💰 Cost Optimization Analysis\n\n**Period:** {start_time.date()} to {end_time.date()}\n\n## Overview\n\nThis notebook analyzes cost optimization opportunities for the LLM application."
-                                    }
-                                }
-                            },
-                            {
-                                "type": "timeseries",
-                                "attributes": {
-                                    "definition": {
-                                        "requests": [
-                                            {
-                                                "q": "sum:llm.cost.usd{service:llm-reliability-control-plane} by {endpoint}",
-                                                "display_type": "bars",
-                                                "style": {
-                                                    "palette": "dog_classic"
-                                                }
-                                            }
-                                        ],
-                                        "yaxis": {
-                                            "label": "Cost (USD)",
-                                            "scale": "linear"
-                                        },
-                                        "title": "Cost by Endpoint"
-                                    }
-                                }
-                            },
-                            {
-                                "type": "timeseries",
-                                "attributes": {
-                                    "definition": {
-                                        "requests": [
-                                            {
-                                                "q": "sum:llm.tokens.input{service:llm-reliability-control-plane}",
-                                                "display_type": "line"
-                                            },
-                                            {
-                                                "q": "sum:llm.tokens.output{service:llm-reliability-control-plane}",
-                                                "display_type": "line"
-                                            }
-                                        ],
-                                        "yaxis": {
-                                            "label": "Tokens",
-                                            "scale": "linear"
-                                        },
-                                        "title": "Token Usage Trends"
-                                    }
-                                }
-                            },
-                            {
-                                "type": "query_value",
-                                "attributes": {
-                                    "definition": {
-                                        "requests": [
-                                            {
-                                                "q": "sum:llm.optimization.savings.total{service:llm-reliability-control-plane}",
-                                                "aggregator": "sum"
-                                            }
-                                        ],
-                                        "title": "Total Savings from Optimizations",
-                                        "precision": 2,
-                                        "text_align": "center"
-                                    }
-                                }
-                            },
-                            {
-                                "type": "markdown",
-                                "attributes": {
-                                    "definition": {
-                                        "text": "## 💡 Recommendations\n\n1. **High-Cost Endpoints:** Identify endpoints with highest cost\n2. **Token Optimization:** Review token usage patterns\n3. **Model Selection:** Consider model downgrades for non-critical requests\n4. **Caching:** Implement response caching for repeated queries"
-                                    }
-                                }
-                            }
+                            _markdown_cell(_COST_HEADER_TMPL.format(start=start_time.date(), end=end_time.date())),
+                            *_COST_STATIC_CELLS
                         ]
                     }
                 }
             }
             
+            _notebooks_api_bucket.acquire()
             response = api.Notebooks.create(**notebook_data)
             logger.info(f"Created cost optimization notebook")
             return response
@@ -310,22 +350,22 @@ class NotebooksIntegration:
             return {"error": "Notebooks integration disabled"}
         
         try:
+            affected = attribution.get('affected_resources', {})
             notebook_data = {
                 "data": {
                     "attributes": {
                         "name": f"Anomaly Analysis: {anomaly_id}",
                         "cells": [
-                            {
-                                "type": "markdown",
-                                "attributes": {
-                                    "definition": {
-                                        "text": f"# 🚨 Anomaly Analysis\n\n**Anomaly ID:** {anomaly_id}\n**Metric:** {metric_name}\n\n## Attribution\n\n**Primary Cause:** {attribution.get('primary_cause', {}).get('description', 'Unknown')}\n**Confidence:** {attribution.get('total_confidence', 0) * 100:.1f}%\n\n**Contributing Factors:**\n" + "\n".join([
-                                            f"- {factor.get('description', 'Unknown')}"
-                                            for factor in attribution.get('contributing_factors', [])
-                                        ])
-                                    }
-                                }
-                            },
+                            _markdown_cell(_ANOMALY_HEADER_TMPL.format(
+                                anomaly_id=anomaly_id,
+                                metric_name=metric_name,
+                                primary_cause=attribution.get('primary_cause', {}).get('description', 'Unknown'),
+                                confidence=attribution.get('total_confidence', 0) * 100,
+                                factors="\n".join(
+                                    f"- {factor.get('description', 'Unknown')}"
+                                    for factor in attribution.get('contributing_factors', [])
+                                ),
+                            )),
                             {
                                 "type": "timeseries",
                                 "attributes": {
@@ -344,19 +384,19 @@ class NotebooksIntegration:
                                     }
                                 }
                             },
-                            {
-                                "type": "markdown",
-                                "attributes": {
-                                    "definition": {
-                                        "text": f"## 📊 Analysis\n\n**Baseline Value:** {attribution.get('baseline_value', 0)}\n**Anomalous Value:** {attribution.get('anomalous_value', 0)}\n**Change:** {attribution.get('change_percentage', 0):.1f}%\n\n**Affected Resources:**\n- Endpoints: {', '.join(attribution.get('affected_resources', {}).get('endpoints', []))}\n- Models: {', '.join(attribution.get('affected_resources', {}).get('models', []))}"
-                                    }
-                                }
-                            }
+                            _markdown_cell(_ANOMALY_ANALYSIS_TMPL.format(
+                                baseline=attribution.get('baseline_value', 0),
+                                anomalous=attribution.get('anomalous_value', 0),
+                                change=attribution.get('change_percentage', 0),
+                                endpoints=', '.join(affected.get('endpoints', [])),
+                                models=', '.join(affected.get('models', [])),
+                            ))
                         ]
                     }
                 }
             }
             
+            _notebooks_api_bucket.acquire()
             response = api.Notebooks.create(**notebook_data)
             logger.info(f"Created anomaly analysis notebook: {anomaly_id}")
             return response
@@ -369,15 +409,43 @@ class NotebooksIntegration:
                 "error": str(e)
             }
 
+    
+    def create_all_notebooks(self, specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several notebooks concurrently.
+        
+        Each spec names the notebook "type" ("root_cause", "cost_optimization" or "anomaly");
+        its other keys are passed to the matching create_* method. Results are in spec order;
+        a spec that is invalid or fails gets an error dict without failing the others.
+        """
+        creators = {
+            "root_cause": self.create_root_cause_analysis_notebook,
+            "cost_optimization": self.create_cost_optimization_notebook,
+            "anomaly": self.create_anomaly_analysis_notebook,
+        }
+        
+        def create(spec: Dict[str, Any]) -> Dict[str, Any]:
+            kwargs = dict(spec)
+            creator = creators.get(kwargs.pop("type", None))
+            if creator is None:
+                return {"error": f"Unknown notebook type: {spec.get('type')}"}
+            try:
+                return creator(**kwargs)
+            except Exception as e:
+                logger.error(f"Failed to create {spec.get('type')} notebook: {e}")
+                return {"error": str(e)}
+        
+        if not specs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(NOTEBOOK_CREATE_WORKERS, len(specs))) as executor:
+            return list(executor.map(create, specs))
+
 
 # Global instance
-_notebooks: Optional[NotebooksIntegration] = None
+_notebooks = LazySingleton(NotebooksIntegration)
 
 
 def get_notebooks() -> NotebooksIntegration:
     """Get or create global NotebooksIntegration instance."""
-    global _notebooks
-    if _notebooks is None:
-        _notebooks = NotebooksIntegration()
-    return _notebooks
+    return _notebooks.get()
 
@@ -6,10 +6,17 @@ Programmatically manages on-call schedules and triggers pages.
 """
 
 import os
+import json
 import logging
+import time
+import uuid
 import requests
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime, timezone
+from urllib3.util.retry import Retry
+
+from .singleton import LazySingleton
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +27,38 @@ except ImportError:
     DD_API_AVAILABLE = False
     logger.warning("Datadog API not available. Install: pip install datadog")
 
+# Request bodies are serialized to bytes and responses parsed from bytes; orjson is used when installed
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+    
+    _json_loads = json.loads
+
+# On-call API calls share one keep-alive session. Rate limits and 5xx responses are retried
+# with exponential backoff (honouring Retry-After) before a page falls back to an event. POSTs
+# are retried too: each carries an Idempotency-Key, so a retried page or rule is deduplicated.
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 16
+HTTP_RETRY = Retry(
+    total=5,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"GET", "POST"}),
+    respect_retry_after_header=True,
+)
+# (connect, read) seconds
+HTTP_TIMEOUT = (3.05, 10)
+
+# Rotations change on the order of hours, so the current on-call of a schedule is reused for
+# this long; if a query fails, the last known answer is returned however old it is
+ONCALL_CACHE_TTL_SECONDS = 30
+
+# Critical errors page this schedule with this message
+CRITICAL_ERROR_SCHEDULE = "Primary LLM On-Call"
+_CRITICAL_ERROR_PAGE_TMPL = "🚨 Critical LLM Error Detected\n\n{error_message}\n\nMonitor: {monitor}\nIncident: {incident}"
+
 
 class OnCallIntegration:
     """
@@ -29,6 +68,8 @@ class OnCallIntegration:
     """
     
     def __init__(self):
+        # schedule name -> (fetched at (monotonic), current on-call response)
+        self._oncall_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
         if DD_API_AVAILABLE:
             self.api_key = os.getenv("DD_API_KEY") or os.getenv("LRCP_DATADOG_API_KEY")
             self.app_key = os.getenv("DD_APP_KEY")
@@ -38,11 +79,31 @@ class OnCallIntegration:
                 api._application_key = self.app_key
                 self.enabled = True
                 self.base_url = f"https://api.{self.site}"
+                self._pages_url = f"{self.base_url}/api/v1/oncall/pages"
+                self._rules_url = f"{self.base_url}/api/v1/oncall/rules"
+                # schedule name -> current on-call URL, formatted on first use
+                self._current_oncall_urls: Dict[str, str] = {}
+                self._session = requests.Session()
+                self._session.headers.update({
+                    "DD-API-KEY": self.api_key,
+                    "DD-APPLICATION-KEY": self.app_key,
+                    "Content-Type": "application/json",
+                })
+                self._session.mount("https://", HTTPAdapter(
+                    pool_connections=HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    max_retries=HTTP_RETRY,
+                ))
             else:
                 self.enabled = False
         else:
             self.enabled = False
     
+    def close(self) -> None:
+        """Close the pooled connections of the API session."""
+        if self.enabled:
+            self._session.close()
+    
     def page_oncall(
         self,
         schedule_name: str,
@@ -63,26 +124,26 @@ class OnCallIntegration:
         try:
             # Use Datadog On-Call API to page
             # Note: On-Call API format may vary
-            url = f"{self.base_url}/api/v1/oncall/pages"
-            headers = {
-                "DD-API-KEY": self.api_key,
-                "DD-APPLICATION-KEY": self.app_key,
-                "Content-Type": "application/json",
-            }
+            url = self._pages_url
             
             payload = {
                 "schedule": schedule_name,
                 "message": message,
                 "severity": severity,
                 "incident_id": incident_id,
-                "triggered_at": datetime.now().isoformat(),
+                "triggered_at": datetime.now(timezone.utc).isoformat(),
             }
             
-            response = requests.post(url, json=payload, headers=headers)
+            response = self._session.post(
+                url,
+                data=_json_dumps(payload),
+                headers={"Idempotency-Key": uuid.uuid4().hex},
+                timeout=HTTP_TIMEOUT,
+            )
             response.raise_for_status()
             
             logger.info(f"Paged on-call: {schedule_name}")
-            return response.json()
+            return _json_loads(response.content)
             
         except Exception as e:
             logger.error(f"Failed to page on-call: {e}")
@@ -124,25 +185,37 @@ class OnCallIntegration:
             logger.error(f"Failed to create on-call event: {e}")
             return {"error": str(e)}
     
-    def get_current_oncall(self, schedule_name: str) -> Dict[str, Any]:
-        """Get current on-call engineer for a schedule."""
+    def get_current_oncall(self, schedule_name: str, max_age: float = ONCALL_CACHE_TTL_SECONDS) -> Dict[str, Any]:
+        """
+        Get current on-call engineer for a schedule.
+        
+        Answers fetched less than max_age seconds ago are reused; if the query fails,
+        the last known answer for the schedule is returned instead of an error.
+        """
         if not self.enabled:
             return {"error": "On-Call integration disabled"}
         
+        cached = self._oncall_cache.get(schedule_name)
+        if cached is not None and time.monotonic() - cached[0] < max_age:
+            return cached[1]
+        
         try:
             # Query on-call schedule
-            url = f"{self.base_url}/api/v1/oncall/schedules/{schedule_name}/current"
-            headers = {
-                "DD-API-KEY": self.api_key,
-                "DD-APPLICATION-KEY": self.app_key,
-            }
-            
-            response = requests.get(url, headers=headers)
+            url = self._current_oncall_urls.get(schedule_name)
+            if url is None:
+                url = f"{self.base_url}/api/v1/oncall/schedules/{schedule_name}/current"
+                self._current_oncall_urls[schedule_name] = url
+            response = self._session.get(url, timeout=HTTP_TIMEOUT)
             response.raise_for_status()
             
-            return response.json()
+            current = _json_loads(response.content)
+            self._oncall_cache[schedule_name] = (time.monotonic(), current)
+            return current
             
         except Exception as e:
+            if cached is not None:
+                logger.warning(f"Failed to get current on-call, returning last known: {e}")
+                return cached[1]
             logger.error(f"Failed to get current on-call: {e}")
             return {
                 "schedule": schedule_name,
@@ -188,18 +261,17 @@ class OnCallIntegration:
             
             # Create rule via API
             # Note: On-Call API format may vary
-            url = f"{self.base_url}/api/v1/oncall/rules"
-            headers = {
-                "DD-API-KEY": self.api_key,
-                "DD-APPLICATION-KEY": self.app_key,
-                "Content-Type": "application/json",
-            }
-            
-            response = requests.post(url, json=rule_config, headers=headers)
+            url = self._rules_url
+            response = self._session.post(
+                url,
+                data=_json_dumps(rule_config),
+                headers={"Idempotency-Key": uuid.uuid4().hex},
+                timeout=HTTP_TIMEOUT,
+            )
             response.raise_for_status()
             
             logger.info(f"Created auto-paging rule for monitor: {monitor_name}")
-            return response.json()
+            return _json_loads(response.content)
             
         except Exception as e:
             logger.error(f"Failed to create auto-paging rule: {e}")
@@ -221,21 +293,22 @@ class OnCallIntegration:
         This is called automatically when critical errors are detected.
         """
         return self.page_oncall(
-            schedule_name="Primary LLM On-Call",
-            message=f"🚨 Critical LLM Error Detected\n\n{error_message}\n\nMonitor: {monitor_name or 'Unknown'}\nIncident: {incident_id or 'N/A'}",
+            schedule_name=CRITICAL_ERROR_SCHEDULE,
+            message=_CRITICAL_ERROR_PAGE_TMPL.format(
+                error_message=error_message,
+                monitor=monitor_name or "Unknown",
+                incident=incident_id or "N/A",
+            ),
             severity="critical",
             incident_id=incident_id,
         )
 
 
 # Global instance
-_oncall: Optional[OnCallIntegration] = None
+_oncall = LazySingleton(OnCallIntegration)
 
 
 def get_oncall() -> OnCallIntegration:
     """Get or create global OnCallIntegration instance."""
-    global _oncall
-    if _oncall is None:
-        _oncall = OnCallIntegration()
-    return _oncall
+    return _oncall.get()
 
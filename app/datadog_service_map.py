@@ -7,8 +7,10 @@ Enhances service tagging and dependency tracking.
 
 import os
 import logging
+import threading
 from typing import Dict, List, Any, Optional
-from ddtrace import tracer
+
+from .singleton import LazySingleton
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +22,10 @@ except ImportError:
     tracer = None
     logger.warning("ddtrace not available. Service Map integration disabled.")
 
+# Service tags that do not depend on the service, built once
+_STATIC_SERVICE_TAGS = {"env": "production"}
+_SCALAR_TAG_TYPES = (str, int, float, bool)
+
 
 class ServiceMapIntegration:
     """
@@ -32,6 +38,11 @@ class ServiceMapIntegration:
         self.enabled = DD_TRACING_ENABLED and tracer is not None
         if not self.enabled:
             logger.warning("Service Map integration disabled: ddtrace not available")
+        # Global tags last applied by enhance_service_tags, to skip re-applying identical ones
+        self._applied_service_tags: Optional[tuple] = None
+        # The LLM dependencies are static, so they are traced once per process
+        self._llm_dependencies_tracked = False
+        self._llm_dependencies_lock = threading.Lock()
     
     def enhance_service_tags(
         self,
@@ -53,24 +64,27 @@ class ServiceMapIntegration:
             # Set service metadata that appears in Service Map
             # These tags help Service Map visualize dependencies
             
-            tags = [
-                f"service:{service_name}",
-                f"service_type:{service_type}",
-                "env:production",
-            ]
-            
-            if dependencies:
-                for dep in dependencies:
-                    tags.append(f"depends_on:{dep}")
+            # tracer.set_tags takes a mapping, so dependencies share one comma-separated tag
+            tags = {
+                "service": service_name,
+                "service_type": service_type,
+                **_STATIC_SERVICE_TAGS,
+                **({"depends_on": ",".join(dependencies)} if dependencies else {}),
+                **{
+                    key: value
+                    for key, value in (metadata or {}).items()
+                    if isinstance(value, _SCALAR_TAG_TYPES)
+                },
+            }
             
-            if metadata:
-                for key, value in metadata.items():
-                    if isinstance(value, (str, int, float, bool)):
-                        tags.append(f"{key}:{value}")
+            applied = tuple(sorted(tags.items()))
+            if applied == self._applied_service_tags:
+                return
             
             # Set global service tags
             # These will appear in all spans for this service
             tracer.set_tags(tags)
+            self._applied_service_tags = applied
             
             logger.info(f"Enhanced service tags for Service Map: {service_name}")
             
@@ -118,10 +132,15 @@ class ServiceMapIntegration:
         Track LLM service dependencies for Service Map.
         
         This demonstrates deep integration: automatically tracking
-        all LLM service dependencies.
+        all LLM service dependencies. Only the first call traces them; later
+        calls are no-ops, so calling this per request adds no spans.
         """
-        if not self.enabled:
+        if not self.enabled or self._llm_dependencies_tracked:
             return
+        with self._llm_dependencies_lock:
+            if self._llm_dependencies_tracked:
+                return
+            self._llm_dependencies_tracked = True
         
         # Track dependencies
         self.track_service_dependency(
@@ -189,13 +208,10 @@ class ServiceMapIntegration:
 
 
 # Global instance
-_service_map: Optional[ServiceMapIntegration] = None
+_service_map = LazySingleton(ServiceMapIntegration)
 
 
 def get_service_map() -> ServiceMapIntegration:
     """Get or create global ServiceMapIntegration instance."""
-    global _service_map
-    if _service_map is None:
-        _service_map = ServiceMapIntegration()
-    return _service_map
+    return _service_map.get()
 
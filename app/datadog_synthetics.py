@@ -7,18 +7,92 @@ Creates and manages synthetic tests programmatically.
 
 import os
 import logging
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+from .blocking import run_blocking
+
+from .singleton import LazySingleton
 
 logger = logging.getLogger(__name__)
 
 try:
-    from datadog import api
+    from datadog import api, statsd
     DD_API_AVAILABLE = True
 except ImportError:
     DD_API_AVAILABLE = False
     logger.warning("Datadog API not available. Install: pip install datadog")
 
+# Test and monitor API calls are I/O-bound, so a batch is sent on up to this many threads.
+# The datadog client sends them over its own shared keep-alive session.
+SYNTHETICS_CREATE_WORKERS = 8
+
+# API test defaults, built once and shared by every test config; the client only serializes them
+_DEFAULT_TEST_LOCATIONS = ("aws:us-east-1", "aws:eu-west-1")
+_DEFAULT_TEST_ASSERTIONS = (
+    {"type": "statusCode", "operator": "is", "target": 200},
+    {"type": "responseTime", "operator": "lessThan", "target": 2000},
+)
+_DEFAULT_TEST_TAGS = ("llm", "api", "synthetic")
+_DEFAULT_TEST_OPTIONS = {
+    "min_failure_duration": 0,
+    "min_location_failed": 1,
+    "follow_redirects": True,
+    "retry": {
+        "count": 2,
+        "interval": 1000,
+    },
+}
+
+
+def _health_check_test_spec(service_url: str) -> Dict[str, Any]:
+    return dict(
+        name="LLM Control Plane Health Check",
+        url=f"{service_url}/health",
+        method="GET",
+        assertions=[
+            {"type": "statusCode", "operator": "is", "target": 200},
+            {"type": "body", "operator": "contains", "target": "healthy"},
+            {"type": "responseTime", "operator": "lessThan", "target": 1000},
+        ],
+        frequency=60,  # Every minute
+        tags=["llm", "health", "critical"],
+    )
+
+
+def _qa_endpoint_test_spec(service_url: str) -> Dict[str, Any]:
+    return dict(
+        name="LLM QA Endpoint Test",
+        url=f"{service_url}/qa",
+        method="POST",
+        body='{"question": "What is Datadog?", "document": "Datadog is a monitoring platform."}',
+        headers={"Content-Type": "application/json"},
+        assertions=[
+            {"type": "statusCode", "operator": "is", "target": 200},
+            {"type": "body", "operator": "validatesJSONPath", "target": "$.answer"},
+            {"type": "responseTime", "operator": "lessThan", "target": 5000},
+        ],
+        frequency=300,  # Every 5 minutes
+        tags=["llm", "qa", "endpoint"],
+    )
+
+
+def _latency_test_spec(service_url: str) -> Dict[str, Any]:
+    return dict(
+        name="LLM Latency SLO Test",
+        url=f"{service_url}/reason",
+        method="POST",
+        body='{"prompt": "Explain observability"}',
+        headers={"Content-Type": "application/json"},
+        assertions=[
+            {"type": "statusCode", "operator": "is", "target": 200},
+            {"type": "responseTime", "operator": "lessThan", "target": 2000},  # SLO threshold
+        ],
+        frequency=180,  # Every 3 minutes
+        tags=["llm", "latency", "slo"],
+    )
+
 
 class SyntheticsIntegration:
     """
@@ -71,16 +145,13 @@ class SyntheticsIntegration:
             return {"error": "Synthetics integration disabled"}
         
         if locations is None:
-            locations = ["aws:us-east-1", "aws:eu-west-1"]
+            locations = _DEFAULT_TEST_LOCATIONS
         
         if assertions is None:
-            assertions = [
-                {"type": "statusCode", "operator": "is", "target": 200},
-                {"type": "responseTime", "operator": "lessThan", "target": 2000},
-            ]
+            assertions = _DEFAULT_TEST_ASSERTIONS
         
         if tags is None:
-            tags = ["llm", "api", "synthetic"]
+            tags = _DEFAULT_TEST_TAGS
         
         try:
             # Create API test configuration
@@ -96,16 +167,7 @@ class SyntheticsIntegration:
                     "assertions": assertions,
                 },
                 "locations": locations,
-                "options": {
-                    "tick_every": frequency,
-                    "min_failure_duration": 0,
-                    "min_location_failed": 1,
-                    "follow_redirects": True,
-                    "retry": {
-                        "count": 2,
-                        "interval": 1000,
-                    },
-                },
+                "options": {"tick_every": frequency, **_DEFAULT_TEST_OPTIONS},
                 "message": f"🚨 **Synthetic Test Failed: {name}**\n\n**What failed?** API test failed for {url}\n\n**Why did it fail?** Possible causes:\n- Service is down or unreachable\n- Response time exceeded threshold\n- Response status code is not 200\n- Network connectivity issues\n\n**What should the engineer do next?**\n1. Check service health endpoint\n2. Review recent deployments\n3. Check network connectivity\n4. Review response time trends\n\n**Test Details:**\n- URL: {url}\n- Method: {method}\n- Locations: {', '.join(locations)}",
                 "tags": tags,
             }
@@ -125,51 +187,55 @@ class SyntheticsIntegration:
     
     def create_health_check_test(self, service_url: str) -> Dict[str, Any]:
         """Create a health check synthetic test."""
-        return self.create_api_test(
-            name="LLM Control Plane Health Check",
-            url=f"{service_url}/health",
-            method="GET",
-            assertions=[
-                {"type": "statusCode", "operator": "is", "target": 200},
-                {"type": "body", "operator": "contains", "target": "healthy"},
-                {"type": "responseTime", "operator": "lessThan", "target": 1000},
-            ],
-            frequency=60,  # Every minute
-            tags=["llm", "health", "critical"],
-        )
+        return self.create_api_test(**_health_check_test_spec(service_url))
     
     def create_qa_endpoint_test(self, service_url: str) -> Dict[str, Any]:
         """Create a test for the QA endpoint."""
-        return self.create_api_test(
-            name="LLM QA Endpoint Test",
-            url=f"{service_url}/qa",
-            method="POST",
-            body='{"question": "What is Datadog?", "document": "Datadog is a monitoring platform."}',
-            headers={"Content-Type": "application/json"},
-            assertions=[
-                {"type": "statusCode", "operator": "is", "target": 200},
-                {"type": "body", "operator": "validatesJSONPath", "target": "$.answer"},
-                {"type": "responseTime", "operator": "lessThan", "target": 5000},
-            ],
-            frequency=300,  # Every 5 minutes
-            tags=["llm", "qa", "endpoint"],
-        )
+        return self.create_api_test(**_qa_endpoint_test_spec(service_url))
     
     def create_latency_test(self, service_url: str) -> Dict[str, Any]:
         """Create a latency-focused test."""
-        return self.create_api_test(
-            name="LLM Latency SLO Test",
-            url=f"{service_url}/reason",
-            method="POST",
-            body='{"prompt": "Explain observability"}',
-            headers={"Content-Type": "application/json"},
-            assertions=[
-                {"type": "statusCode", "operator": "is", "target": 200},
-                {"type": "responseTime", "operator": "lessThan", "target": 2000},  # SLO threshold
-            ],
-            frequency=180,  # Every 3 minutes
-            tags=["llm", "latency", "slo"],
-        )
+        return self.create_api_test(**_latency_test_spec(service_url))
+    
+    def _map_concurrently(self, call: Callable[[Any], Dict[str, Any]], items: List[Any]) -> List[Dict[str, Any]]:
+        """Call call on each item on a thread pool; results are in item order."""
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(SYNTHETICS_CREATE_WORKERS, len(items))) as executor:
+            return list(executor.map(call, items))
+    
+    def create_tests_bulk(self, test_specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create several API tests concurrently.
+        
+        Each spec holds create_api_test's keyword arguments. Results are in spec order.
+        """
+        def create(spec: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+            start = time.monotonic()
+            result = self.create_api_test(**spec)
+            return result, (time.monotonic() - start) * 1000.0
+        
+        timed = self._map_concurrently(create, test_specs)
+        if self.enabled and timed:
+            # One buffered statsd flush for the whole batch instead of a packet per metric
+            try:
+                with statsd:
+                    for spec, (result, elapsed_ms) in zip(test_specs, timed):
+                        failed = "error" in result or "errors" in result
+                        tags = [f"name:{spec['name']}", f"status:{'failed' if failed else 'created'}"]
+                        statsd.increment("lrcp.synthetics.tests_created", tags=tags)
+                        statsd.histogram("lrcp.synthetics.creation_latency_ms", elapsed_ms, tags=tags)
+            except Exception as e:
+                logger.warning(f"Failed to emit synthetics creation metrics: {e}")
+        return [result for result, _ in timed]
+    
+    def provision_default_tests(self, service_url: str) -> List[Dict[str, Any]]:
+        """Create the health check, QA endpoint and latency tests in one concurrent batch."""
+        return self.create_tests_bulk([
+            _health_check_test_spec(service_url),
+            _qa_endpoint_test_spec(service_url),
+            _latency_test_spec(service_url),
+        ])
     
     def get_test_results(
         self,
@@ -182,10 +248,11 @@ class SyntheticsIntegration:
             return {"error": "Synthetics integration disabled"}
         
         try:
+            now = time.time()
             if from_timestamp is None:
-                from_timestamp = int((datetime.now().timestamp() - 3600))  # Last hour
+                from_timestamp = int(now - 3600)  # Last hour
             if to_timestamp is None:
-                to_timestamp = int(datetime.now().timestamp())
+                to_timestamp = int(now)
             
             response = api.Synthetics.get_test_results(
                 public_id=test_id,
@@ -237,6 +304,30 @@ class SyntheticsIntegration:
             logger.error(f"Failed to resume test: {e}")
             return {"error": str(e)}
     
+    def pause_tests(self, test_ids: List[str]) -> List[Dict[str, Any]]:
+        """Pause several synthetic tests concurrently; results are in test order."""
+        return self._map_concurrently(self.pause_test, test_ids)
+    
+    def resume_tests(self, test_ids: List[str]) -> List[Dict[str, Any]]:
+        """Resume several synthetic tests concurrently; results are in test order."""
+        return self._map_concurrently(self.resume_test, test_ids)
+    
+    async def create_tests_bulk_async(self, test_specs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Async-friendly create_tests_bulk for request handlers."""
+        return await run_blocking(self.create_tests_bulk, test_specs)
+    
+    async def provision_default_tests_async(self, service_url: str) -> List[Dict[str, Any]]:
+        """Async-friendly provision_default_tests for request handlers."""
+        return await run_blocking(self.provision_default_tests, service_url)
+    
+    async def pause_tests_async(self, test_ids: List[str]) -> List[Dict[str, Any]]:
+        """Async-friendly pause_tests for request handlers."""
+        return await run_blocking(self.pause_tests, test_ids)
+    
+    async def resume_tests_async(self, test_ids: List[str]) -> List[Dict[str, Any]]:
+        """Async-friendly resume_tests for request handlers."""
+        return await run_blocking(self.resume_tests, test_ids)
+    
     def create_monitor_from_test(self, test_id: str) -> Dict[str, Any]:
         """
         Create a monitor that triggers when synthetic test fails.
@@ -272,15 +363,17 @@ class SyntheticsIntegration:
             logger.error(f"Failed to create monitor from test: {e}")
             return {"error": str(e)}
 
+    
+    def create_monitors_from_tests(self, test_ids: List[str]) -> List[Dict[str, Any]]:
+        """Create a failure monitor for each synthetic test concurrently; results are in test order."""
+        return self._map_concurrently(self.create_monitor_from_test, test_ids)
+
 
 # Global instance
-_synthetics: Optional[SyntheticsIntegration] = None
+_synthetics = LazySingleton(SyntheticsIntegration)
 
 
 def get_synthetics() -> SyntheticsIntegration:
     """Get or create global SyntheticsIntegration instance."""
-    global _synthetics
-    if _synthetics is None:
-        _synthetics = SyntheticsIntegration()
-    return _synthetics
+    return _synthetics.get()
 
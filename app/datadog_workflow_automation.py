@@ -8,8 +8,12 @@ Programmatically creates and triggers workflows.
 import os
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+from urllib3.util.retry import Retry
+
+from .blocking import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,13 @@ except ImportError:
     DD_API_AVAILABLE = False
     logger.warning("Datadog API not available. Install: pip install datadog")
 
+# Workflow triggers and remediation actions share one keep-alive session; connection errors,
+# rate limits and gateway errors are retried with a short backoff
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 20
+HTTP_RETRY = Retry(total=3, backoff_factor=0.2, status_forcelist=(429, 502, 503, 504))
+HTTP_TIMEOUT = 10
+
 
 class WorkflowAutomationIntegration:
     """
@@ -29,6 +40,15 @@ class WorkflowAutomationIntegration:
     """
     
     def __init__(self):
+        # Remediation actions call the app itself, so the session is used with or without API keys
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNECTIONS,
+            pool_maxsize=HTTP_POOL_MAXSIZE,
+            max_retries=HTTP_RETRY,
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
         if DD_API_AVAILABLE:
             self.api_key = os.getenv("DD_API_KEY") or os.getenv("LRCP_DATADOG_API_KEY")
             self.app_key = os.getenv("DD_APP_KEY")
@@ -38,11 +58,21 @@ class WorkflowAutomationIntegration:
                 api._application_key = self.app_key
                 self.enabled = True
                 self.base_url = f"https://api.{self.site}"
+                # Sent per request rather than set on the session, which also calls the app
+                self._dd_headers = {
+                    "DD-API-KEY": self.api_key,
+                    "DD-APPLICATION-KEY": self.app_key,
+                    "Content-Type": "application/json",
+                }
             else:
                 self.enabled = False
         else:
             self.enabled = False
     
+    def close(self) -> None:
+        """Close the pooled connections of the HTTP session."""
+        self._session.close()
+    
     def trigger_workflow(
         self,
         workflow_id: str,
@@ -62,18 +92,12 @@ class WorkflowAutomationIntegration:
             # Use Datadog API to trigger workflow
             # Note: Workflow Automation API may vary
             url = f"{self.base_url}/api/v1/workflow/{workflow_id}/trigger"
-            headers = {
-                "DD-API-KEY": self.api_key,
-                "DD-APPLICATION-KEY": self.app_key,
-                "Content-Type": "application/json",
-            }
-            
             payload = {
                 "context": context or {},
                 "triggered_at": datetime.now().isoformat(),
             }
             
-            response = requests.post(url, json=payload, headers=headers)
+            response = self._session.post(url, json=payload, headers=self._dd_headers, timeout=HTTP_TIMEOUT)
             response.raise_for_status()
             
             logger.info(f"Triggered workflow: {workflow_id}")
@@ -215,7 +239,7 @@ class WorkflowAutomationIntegration:
                 "timestamp": datetime.now().isoformat(),
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._session.post(url, json=payload, timeout=HTTP_TIMEOUT)
             response.raise_for_status()
             
             logger.info(f"Executed model switch via workflow: {model}")
@@ -251,7 +275,7 @@ class WorkflowAutomationIntegration:
                 "triggered_by": "workflow_automation",
             }
             
-            response = requests.post(url, json=payload, timeout=10)
+            response = self._session.post(url, json=payload, timeout=HTTP_TIMEOUT)
             response.raise_for_status()
             
             logger.info("Executed cache enable via workflow")
@@ -268,6 +292,31 @@ class WorkflowAutomationIntegration:
                 "error": str(e)
             }
 
+    
+    async def trigger_workflow_async(
+        self,
+        workflow_id: str,
+        context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Async-friendly trigger_workflow for request handlers."""
+        return await run_blocking(self.trigger_workflow, workflow_id, context)
+    
+    async def execute_model_switch_async(
+        self,
+        model: str,
+        reason: str,
+        app_url: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Async-friendly execute_model_switch for request handlers."""
+        return await run_blocking(self.execute_model_switch, model, reason, app_url)
+    
+    async def execute_cache_enable_async(
+        self,
+        app_url: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Async-friendly execute_cache_enable for request handlers."""
+        return await run_blocking(self.execute_cache_enable, app_url)
+
 
 # Global instance
 _workflow_automation: Optional[WorkflowAutomationIntegration] = None
@@ -13,6 +13,17 @@ This single metric provides at-a-glance system health.
 
 from typing import Dict
 
+import numpy as np
+
+# Weights of the component scores in the composite health score
+_SCORE_WEIGHTS = {
+    "performance": 0.25,
+    "reliability": 0.25,
+    "cost": 0.20,
+    "quality": 0.20,
+    "security": 0.10,
+}
+
 
 def calculate_health_score(
     *,
@@ -43,8 +54,7 @@ def calculate_health_score(
     if latency_ms < 500:
         performance_score = 100.0
     elif latency_ms < 1000:
-        performance_score = 80.0 + (500 / 500) * 20  # Linear interpolation
-        performance_score = max(80.0, 100.0 - ((latency_ms - 500) / 500) * 20)
+        performance_score = 100.0 - ((latency_ms - 500) / 500) * 20
     elif latency_ms < 1500:
         performance_score = 60.0 - ((latency_ms - 1000) / 500) * 60
     else:
@@ -80,13 +90,7 @@ def calculate_health_score(
     efficiency_bonus = min(10.0, token_efficiency * 10.0) if token_efficiency > 0 else 0.0
     
     # Weighted composite score
-    weights = {
-        "performance": 0.25,
-        "reliability": 0.25,
-        "cost": 0.20,
-        "quality": 0.20,
-        "security": 0.10,
-    }
+    weights = _SCORE_WEIGHTS
     
     health_score = (
         performance_score * weights["performance"]
@@ -119,3 +123,73 @@ def calculate_health_score(
         },
     }
 
+
+
+def calculate_health_score_batch(
+    *,
+    latency_ms: np.ndarray,
+    error_rate: np.ndarray,
+    retry_rate: np.ndarray,
+    cost_per_request: np.ndarray,
+    quality_score: np.ndarray,
+    safety_block_rate: np.ndarray,
+    token_efficiency: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Vectorized calculate_health_score for N samples at once.
+    
+    Takes array-likes of equal length (scalars broadcast) and returns one array per score,
+    rounded to 2 decimals like the scalar version; there is no breakdown.
+    """
+    latency_ms = np.asarray(latency_ms, dtype=float)
+    cost_per_request = np.asarray(cost_per_request, dtype=float)
+    token_efficiency = np.asarray(token_efficiency, dtype=float)
+    
+    # Same bands as calculate_health_score, including its steps at 1000ms/1500ms and $0.01/$0.1
+    performance_score = np.select(
+        [latency_ms < 500, latency_ms < 1000, latency_ms < 1500],
+        [
+            100.0,
+            100.0 - ((latency_ms - 500) / 500) * 20,
+            60.0 - ((latency_ms - 1000) / 500) * 60,
+        ],
+        np.maximum(0.0, 60.0 - ((latency_ms - 1500) / 500) * 60),
+    )
+    
+    reliability_score = np.maximum(0.0, 100.0 - np.asarray(error_rate, dtype=float) * 1000)
+    retry_penalty = np.minimum(20.0, np.asarray(retry_rate, dtype=float) * 100)
+    reliability_score = np.maximum(0.0, reliability_score - retry_penalty)
+    
+    cost_score = np.select(
+        [cost_per_request < 0.001, cost_per_request < 0.01, cost_per_request < 0.1],
+        [
+            100.0,
+            80.0 - ((cost_per_request - 0.001) / 0.009) * 20,
+            60.0 - ((cost_per_request - 0.01) / 0.09) * 60,
+        ],
+        np.maximum(0.0, 60.0 - ((cost_per_request - 0.1) / 0.1) * 60),
+    )
+    
+    quality_score_normalized = np.asarray(quality_score, dtype=float) * 100.0
+    security_score = np.maximum(0.0, 100.0 - np.asarray(safety_block_rate, dtype=float) * 1000)
+    efficiency_bonus = np.where(token_efficiency > 0, np.minimum(10.0, token_efficiency * 10.0), 0.0)
+    
+    health_score = np.minimum(
+        100.0,
+        performance_score * _SCORE_WEIGHTS["performance"]
+        + reliability_score * _SCORE_WEIGHTS["reliability"]
+        + cost_score * _SCORE_WEIGHTS["cost"]
+        + quality_score_normalized * _SCORE_WEIGHTS["quality"]
+        + security_score * _SCORE_WEIGHTS["security"]
+        + efficiency_bonus,
+    )
+    
+    return {
+        "health_score": np.round(health_score, 2),
+        "performance_score": np.round(performance_score, 2),
+        "reliability_score": np.round(reliability_score, 2),
+        "cost_score": np.round(cost_score, 2),
+        "quality_score": np.round(quality_score_normalized, 2),
+        "security_score": np.round(security_score, 2),
+        "efficiency_bonus": np.round(efficiency_bonus, 2),
+    }
@@ -9,10 +9,17 @@ This is critical for hackathon submission to demonstrate automated incident crea
 """
 
 import os
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
+from .blocking import run_blocking
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -22,6 +29,97 @@ except ImportError:
     DD_API_AVAILABLE = False
     logger.warning("Datadog API not available. Install: pip install datadog")
 
+# Incidents submitted through create_incident_from_monitor_async are batched by a background
+# worker: it waits up to INCIDENT_BATCH_MAX_WAIT_SECONDS (or until INCIDENT_BATCH_MAX_SIZE are
+# queued), merges identical alerts into one incident and creates the distinct ones concurrently
+INCIDENT_BATCH_MAX_SIZE = 20
+INCIDENT_BATCH_MAX_WAIT_SECONDS = 0.2
+INCIDENT_CREATE_WORKERS = 4
+
+# Dashboard titles are resolved to IDs from one listing of all dashboards, reused this long
+# (or only DASHBOARD_IDS_MISS_TTL_SECONDS when the title was not in it, e.g. not created yet);
+# if the listing fails, the last one is used however old it is
+DASHBOARD_IDS_TTL_SECONDS = 3600
+DASHBOARD_IDS_MISS_TTL_SECONDS = 60
+
+
+class _IncidentBatcher:
+    """
+    Background batcher for incident creation during alert storms.
+    
+    The Incidents API creates one incident per request, so a batch is not a single call: what
+    is saved is the duplicate incidents of an alert that fires repeatedly, and the caller's wait
+    on requests queued behind each other.
+    """
+    
+    def __init__(self, create: Callable[..., Dict[str, Any]]):
+        self._create = create
+        self._pending: deque = deque()
+        self._ready = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+    
+    def submit(self, **kwargs: Any) -> Future:
+        """Queue an incident; the future resolves to create_incident_from_monitor's result."""
+        future: Future = Future()
+        with self._ready:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="incident-batcher", daemon=True)
+                self._worker.start()
+            self._pending.append((kwargs, future))
+            if len(self._pending) >= INCIDENT_BATCH_MAX_SIZE:
+                self._ready.notify()
+        return future
+    
+    def _next_batch(self) -> List[Tuple[Dict[str, Any], Future]]:
+        with self._ready:
+            while not self._pending:
+                self._ready.wait()
+            if len(self._pending) < INCIDENT_BATCH_MAX_SIZE:
+                self._ready.wait(INCIDENT_BATCH_MAX_WAIT_SECONDS)
+            count = min(len(self._pending), INCIDENT_BATCH_MAX_SIZE)
+            return [self._pending.popleft() for _ in range(count)]
+    
+    @staticmethod
+    def _merge_key(kwargs: Dict[str, Any]) -> Optional[Tuple]:
+        """Key under which identical submissions are merged, or None if it cannot be hashed."""
+        key = tuple(sorted((name, tuple(value) if isinstance(value, list) else value)
+                           for name, value in kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+    
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                self._create_batch(batch)
+            except Exception as e:
+                # Never leave a caller waiting on a future the worker gave up on
+                logger.error(f"Incident batch failed: {e}", exc_info=True)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result({"success": False, "error": str(e), "incident_id": None})
+    
+    def _create_batch(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        groups: Dict[Tuple, List[Future]] = {}
+        distinct: Dict[Tuple, Dict[str, Any]] = {}
+        for kwargs, future in batch:
+            # Submissions that cannot be hashed are created on their own
+            key = self._merge_key(kwargs) or (id(future),)
+            groups.setdefault(key, []).append(future)
+            distinct.setdefault(key, kwargs)
+        with ThreadPoolExecutor(max_workers=min(INCIDENT_CREATE_WORKERS, len(groups))) as executor:
+            results = {key: executor.submit(self._create, **kwargs) for key, kwargs in distinct.items()}
+        for key, futures in groups.items():
+            try:
+                result = results[key].result()
+            except Exception as e:
+                result = {"success": False, "error": str(e), "incident_id": None}
+            for future in futures:
+                future.set_result(result)
+
 
 class IncidentManager:
     """
@@ -39,6 +137,9 @@ class IncidentManager:
         self.app_key = os.getenv("DD_APP_KEY")
         self.service_name = os.getenv("DD_SERVICE", "llm-reliability-control-plane")
         self.dashboard_name = "LLM Reliability Control Plane"
+        # dashboard title -> ID, and when it was listed (monotonic)
+        self._dashboard_ids: Optional[Dict[str, str]] = None
+        self._dashboard_ids_fetched_at = 0.0
         
         if DD_API_AVAILABLE and self.api_key and self.app_key:
             api._api_key = self.api_key
@@ -48,6 +149,7 @@ class IncidentManager:
         else:
             self.enabled = False
             logger.warning("Incident Manager disabled: Missing API keys")
+        self._batcher = _IncidentBatcher(self.create_incident_from_monitor)
     
     def create_incident_from_monitor(
         self,
@@ -230,6 +332,29 @@ class IncidentManager:
                 "incident_id": None,
             }
     
+    def _resolve_dashboard_id(self, title: str) -> Optional[str]:
+        """Look up a dashboard ID by title, listing all dashboards at most once per TTL."""
+        ttl = DASHBOARD_IDS_TTL_SECONDS
+        if self._dashboard_ids is not None and title not in self._dashboard_ids:
+            ttl = DASHBOARD_IDS_MISS_TTL_SECONDS
+        if self._dashboard_ids is None or time.monotonic() - self._dashboard_ids_fetched_at >= ttl:
+            try:
+                dashboards = api.Dashboard.get_all()
+                if "errors" in dashboards:
+                    # The client returns API errors in the body; raise so they are never cached
+                    raise RuntimeError(f"Datadog dashboard listing failed: {dashboards['errors']}")
+                # Reversed so that, among dashboards sharing a title, the first listed wins
+                self._dashboard_ids = {
+                    dashboard.get("title"): dashboard.get("id")
+                    for dashboard in reversed(dashboards.get("dashboards", []))
+                }
+                self._dashboard_ids_fetched_at = time.monotonic()
+            except Exception:
+                if self._dashboard_ids is None:
+                    raise
+                logger.warning("Failed to list dashboards, using the last listing")
+        return self._dashboard_ids.get(title)
+    
     def _attach_resources(self, incident_id: str, monitor_name: str) -> None:
         """
         Attach dashboard, logs, and traces to incident.
@@ -238,13 +363,7 @@ class IncidentManager:
         This is a placeholder for the attachment logic.
         """
         try:
-            # Find dashboard by name
-            dashboards = api.Dashboard.get_all()
-            dashboard_id = None
-            for dashboard in dashboards.get("dashboards", []):
-                if dashboard.get("title") == self.dashboard_name:
-                    dashboard_id = dashboard.get("id")
-                    break
+            dashboard_id = self._resolve_dashboard_id(self.dashboard_name)
             
             if dashboard_id:
                 logger.info(f"Found dashboard {dashboard_id} for attachment")
@@ -302,6 +421,20 @@ The system identified unusual patterns that deviate from normal behavior.
             tags=["llm", "ml", "anomaly", insight_type],
         )
 
+    
+    async def create_incident_from_monitor_async(self, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Async-friendly create_incident_from_monitor for request handlers.
+        
+        The incident goes through the background batcher, so concurrent submissions of the
+        same alert share one incident and its result.
+        """
+        return await asyncio.wrap_future(self._batcher.submit(**kwargs))
+    
+    async def create_incident_from_insight_async(self, **kwargs: Any) -> Dict[str, Any]:
+        """Async-friendly create_incident_from_insight for request handlers."""
+        return await run_blocking(self.create_incident_from_insight, **kwargs)
+
 
 # Global instance
 _incident_manager: Optional[IncidentManager] = None
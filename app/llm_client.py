@@ -6,7 +6,7 @@ from typing import Any, Dict, Optional
 
 import google.generativeai as genai
 
-from .config import settings
+from .config import get_settings
 from .model_router import ModelRouter
 from .datadog_llm_observability import get_llm_observability
 
@@ -41,7 +41,7 @@ class LLMClient:
 
     def __init__(self, model_name: Optional[str] = None):
         # Get API key from environment (supports both GEMINI_API_KEY and LRCP_GEMINI_API_KEY)
-        api_key = settings.gemini_api_key or os.getenv("GEMINI_API_KEY") or os.getenv("LRCP_GEMINI_API_KEY")
+        api_key = get_settings().gemini_api_key or os.getenv("GEMINI_API_KEY") or os.getenv("LRCP_GEMINI_API_KEY")
         
         if not api_key:
             raise ValueError(
@@ -50,7 +50,7 @@ class LLMClient:
         
         genai.configure(api_key=api_key)
         # Use provided model or default
-        self.model_name = model_name or settings.gemini_model
+        self.model_name = model_name or get_settings().gemini_model
         self.model = genai.GenerativeModel(self.model_name)
 
     async def generate(
@@ -104,7 +104,7 @@ class LLMClient:
         text = ""
         input_tokens = 0
         output_tokens = 0
-        model_version = settings.gemini_model
+        model_version = get_settings().gemini_model
 
         # Use native Datadog LLM Observability instrumentation
         with llm_obs.llm_generation_span(
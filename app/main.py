@@ -41,9 +41,11 @@ from fastapi.openapi.utils import get_openapi
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 
-from .config import settings
+from .config import get_settings
 from .routes import insights, qa, reason, stress, streaming, incidents, optimization, datadog_integrations
 
+settings = get_settings()
+
 app = FastAPI(
     title=settings.project_name,
     version=settings.datadog_version,
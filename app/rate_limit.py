@@ -0,0 +1,37 @@
+"""
+Client-side rate limiting for Datadog API calls.
+
+Bursts of API calls (e.g. bootstrapping every pipeline and notebook at startup) are
+spread out under the org's rate limits instead of being answered with 429s and retried.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket allowing a sustained rate of requests per minute.
+
+    The bucket starts full, so a burst of up to requests_per_minute calls goes through
+    immediately; after that acquire() blocks until a token has been refilled.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.rate = requests_per_minute
+        self.tokens = float(requests_per_minute)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate / 60.0)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) * 60.0 / self.rate
+            time.sleep(wait)
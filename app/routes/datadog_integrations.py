@@ -4,6 +4,8 @@ API Routes for Deep Datadog Product Integrations
 Exposes endpoints for all 10+ Datadog product integrations.
 """
 
+import asyncio
+
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
@@ -45,6 +47,13 @@ async def create_health_check_test(service_url: str):
     return synthetics.create_health_check_test(service_url)
 
 
+@router.post("/synthetics/provision-defaults", response_model=List[Dict[str, Any]])
+async def provision_default_tests(service_url: str):
+    """Create the health check, QA endpoint and latency tests concurrently."""
+    synthetics = get_synthetics()
+    return await synthetics.provision_default_tests_async(service_url)
+
+
 @router.get("/synthetics/tests", response_model=List[Dict[str, Any]])
 async def list_synthetic_tests():
     """List all synthetic tests."""
@@ -61,7 +70,9 @@ async def create_root_cause_notebook(
 ):
     """Create a root cause analysis notebook."""
     notebooks = get_notebooks()
-    return notebooks.create_root_cause_analysis_notebook(
+    # Notebook creation can wait on the client-side rate limiter; keep it off the event loop
+    return await asyncio.to_thread(
+        notebooks.create_root_cause_analysis_notebook,
         incident_id=incident_id,
         incident_title=incident_title,
         time_range_hours=time_range_hours,
@@ -75,7 +86,8 @@ async def create_cost_optimization_notebook(
 ):
     """Create a cost optimization analysis notebook."""
     notebooks = get_notebooks()
-    return notebooks.create_cost_optimization_notebook(
+    return await asyncio.to_thread(
+        notebooks.create_cost_optimization_notebook,
         recommendation_id=recommendation_id,
         days=days,
     )
@@ -89,7 +101,7 @@ async def trigger_workflow(
 ):
     """Trigger a workflow programmatically."""
     workflow = get_workflow_automation()
-    return workflow.trigger_workflow(workflow_id, context)
+    return await workflow.trigger_workflow_async(workflow_id, context)
 
 
 @router.post("/workflows/model-switch", response_model=Dict[str, Any])
@@ -100,7 +112,7 @@ async def execute_model_switch(
 ):
     """Execute a model switch action (workflow step)."""
     workflow = get_workflow_automation()
-    return workflow.execute_model_switch(model, reason, app_url)
+    return await workflow.execute_model_switch_async(model, reason, app_url)
 
 
 # On-Call Routes
@@ -113,7 +125,8 @@ async def page_oncall(
 ):
     """Page the on-call engineer."""
     oncall = get_oncall()
-    return oncall.page_oncall(schedule_name, message, severity, incident_id)
+    # Paging retries with backoff (and Retry-After); keep it off the event loop
+    return await asyncio.to_thread(oncall.page_oncall, schedule_name, message, severity, incident_id)
 
 
 @router.post("/oncall/critical-error", response_model=Dict[str, Any])
@@ -124,14 +137,14 @@ async def page_on_critical_error(
 ):
     """Page on-call for critical errors."""
     oncall = get_oncall()
-    return oncall.page_on_critical_error(error_message, monitor_name, incident_id)
+    return await asyncio.to_thread(oncall.page_on_critical_error, error_message, monitor_name, incident_id)
 
 
 @router.get("/oncall/current/{schedule_name}", response_model=Dict[str, Any])
 async def get_current_oncall(schedule_name: str):
     """Get current on-call engineer for a schedule."""
     oncall = get_oncall()
-    return oncall.get_current_oncall(schedule_name)
+    return await asyncio.to_thread(oncall.get_current_oncall, schedule_name)
 
 
 # Log Pipelines Routes
@@ -139,28 +152,36 @@ async def get_current_oncall(schedule_name: str):
 async def create_llm_request_pipeline():
     """Create a log pipeline for processing LLM request logs."""
     pipelines = get_log_pipelines()
-    return pipelines.create_llm_request_pipeline()
+    # Pipeline calls can wait on the client-side rate limiter; keep them off the event loop
+    return await asyncio.to_thread(pipelines.create_llm_request_pipeline)
 
 
 @router.post("/log-pipelines/cost", response_model=Dict[str, Any])
 async def create_cost_log_pipeline():
     """Create a pipeline for processing cost-related logs."""
     pipelines = get_log_pipelines()
-    return pipelines.create_cost_log_pipeline()
+    return await asyncio.to_thread(pipelines.create_cost_log_pipeline)
 
 
 @router.post("/log-pipelines/security", response_model=Dict[str, Any])
 async def create_security_redaction_pipeline():
     """Create a pipeline that redacts sensitive information from logs."""
     pipelines = get_log_pipelines()
-    return pipelines.create_security_redaction_pipeline()
+    return await asyncio.to_thread(pipelines.create_security_redaction_pipeline)
+
+
+@router.post("/log-pipelines/all", response_model=List[Dict[str, Any]])
+async def create_all_pipelines():
+    """Create the LLM request, cost and security pipelines concurrently."""
+    pipelines = get_log_pipelines()
+    return await asyncio.to_thread(pipelines.create_all_pipelines)
 
 
 @router.get("/log-pipelines", response_model=List[Dict[str, Any]])
 async def list_log_pipelines():
     """List all log pipelines."""
     pipelines = get_log_pipelines()
-    return pipelines.list_pipelines()
+    return await asyncio.to_thread(pipelines.list_pipelines)
 
 
 # Service Map Routes
@@ -64,7 +64,7 @@ async def create_incident(request: IncidentCreateRequest) -> Dict[str, Any]:
                 detail="Incident Manager is disabled. Please configure Datadog API keys."
             )
         
-        result = manager.create_incident_from_monitor(
+        result = await manager.create_incident_from_monitor_async(
             monitor_name=request.monitor_name,
             alert_message=request.alert_message,
             runbook=request.runbook,
@@ -127,7 +127,7 @@ async def create_incident_from_insight(request: InsightIncidentRequest) -> Dict[
                 detail="Incident Manager is disabled. Please configure Datadog API keys."
             )
         
-        result = manager.create_incident_from_insight(
+        result = await manager.create_incident_from_insight_async(
             insight_type=request.insight_type,
             title=request.title,
             description=request.description,
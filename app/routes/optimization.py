@@ -234,7 +234,7 @@ async def attribute_anomaly(
     else:
         timestamp = datetime.now()
     
-    attribution = engine.attribute_anomaly(
+    attribution = await engine.attribute_anomaly_async(
         metric_name=metric_name,
         anomaly_timestamp=timestamp,
         baseline_period_hours=baseline_period_hours,
@@ -15,7 +15,6 @@ from datetime import datetime
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
-from ..config import settings
 
 logger = logging.getLogger(__name__)
 
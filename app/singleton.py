@@ -0,0 +1,32 @@
+"""
+Process-wide lazily created instances.
+
+The integrations are created on first use rather than at import time (their constructors read
+API keys and may open sessions or start background threads), and must be created only once
+even when the first requests arrive concurrently.
+"""
+
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LazySingleton(Generic[T]):
+    """Holds the one instance built by factory, creating it on the first get()."""
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """Return the instance, creating it if needed."""
+        # Double-checked: once created, callers only read the attribute; the lock guards the first construction
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
@@ -7,7 +7,7 @@ import time
 from contextlib import contextmanager
 from typing import Any, Dict, Iterator
 
-from .config import settings
+from .config import get_settings
 
 # Datadog tracing for trace-log correlation
 try:
@@ -41,9 +41,10 @@ if os.getenv("DD_LOGS_ENABLED", "true").lower() == "true":
 try:
     from datadog import initialize, statsd
 
-    if settings.datadog_api_key:
+    _dd_api_key = get_settings().datadog_api_key
+    if _dd_api_key:
         initialize(
-            api_key=settings.datadog_api_key,
+            api_key=_dd_api_key,
             app_key=os.getenv("DD_APP_KEY"),  # Optional, for API calls
             api_host=os.getenv("DD_SITE", "datadoghq.com"),
             statsd_host=os.getenv("DD_AGENT_HOST", "localhost"),
@@ -54,6 +55,7 @@ except Exception:  # noqa: BLE001
 
 
 def _tags(extra: Dict[str, str] | None = None) -> list[str]:
+    settings = get_settings()
     base = {
         "env": settings.datadog_env,
         "service": settings.datadog_service,
@@ -212,6 +214,7 @@ def log_request(
             trace_id = str(current_span.trace_id)
             span_id = str(current_span.span_id)
     
+    settings = get_settings()
     truncated_prompt = (prompt[:200] + "...") if len(prompt) > 200 else prompt
     log_payload = {
         "prompt_id": prompt_id,